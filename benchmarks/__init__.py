@@ -0,0 +1,3 @@
+"""
+Benchmarks for crust, run each module with python -m benchmarks.<name>.
+"""
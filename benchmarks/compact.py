@@ -0,0 +1,75 @@
+"""
+Compares the memory used by, and the time taken to construct, regular and
+compact (Meta.compact = True) resources.
+
+    python -m benchmarks.compact [number of objects]
+"""
+import sys
+import timeit
+import tracemalloc
+
+from crust.api import Api
+from crust.resources import Resource
+
+
+class BenchApi(Api):
+    url = "http://example.com/api/v1/"
+    resources = {}
+
+
+FIELDS = ["id", "name", "slug", "description", "price", "stock", "active", "category"]
+
+
+class Regular(Resource):
+
+    class Meta:
+        api = BenchApi
+        fields = FIELDS
+
+
+class Compact(Resource):
+
+    class Meta:
+        api = BenchApi
+        fields = FIELDS
+        compact = True
+
+
+def item(i):
+    return {
+        "resource_uri": "/api/v1/item/%s/" % i,
+        "id": i,
+        "name": "Item %s" % i,
+        "slug": "item-%s" % i,
+        "description": "",
+        "price": "9.99",
+        "stock": 10,
+        "active": True,
+        "category": None,
+    }
+
+
+def memory(cls, items):
+    tracemalloc.start()
+    objs = [cls(**data) for data in items]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del objs
+
+    return size
+
+
+def main(argv):
+    number = int(argv[1]) if len(argv) > 1 else 100000
+    items = [item(i) for i in range(number)]
+
+    for cls in (Regular, Compact):
+        size = memory(cls, items)
+        seconds = min(timeit.repeat(lambda: [cls(**data) for data in items], number=1, repeat=3))
+
+        print("%-8s %8.1f bytes/object %10.0f objects/second" % (cls.__name__, float(size) / number, number / seconds))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,39 @@
+"""
+Compares DateTimeField.hydrate against the regex based parsing it replaced.
+
+    python -m benchmarks.datetimes [number of values]
+"""
+import datetime
+import random
+import sys
+import timeit
+
+from crust.fields import DATETIME_REGEX, DateTimeField
+
+
+def regex_hydrate(value):
+    data = DATETIME_REGEX.search(value).groupdict()
+    return datetime.datetime(int(data["year"]), int(data["month"]), int(data["day"]), int(data["hour"]), int(data["minute"]), int(data["second"]))
+
+
+def main(argv):
+    number = int(argv[1]) if len(argv) > 1 else 100000
+
+    start = datetime.datetime(2013, 1, 1)
+    unique = [(start + datetime.timedelta(seconds=i * 37)).isoformat() for i in range(number)]
+    repeated = [random.choice(unique[:100]) for i in range(number)]
+
+    parsers = [
+        ("regex", regex_hydrate),
+        ("hydrate", DateTimeField().hydrate),
+        ("hydrate+cache", DateTimeField(cache_size=1000).hydrate),
+    ]
+
+    for label, values in (("unique", unique), ("repeated", repeated)):
+        for name, parse in parsers:
+            seconds = min(timeit.repeat(lambda: [parse(v) for v in values], number=1, repeat=3))
+            print("%-9s %-14s %10.0f values/second" % (label, name, number / seconds))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
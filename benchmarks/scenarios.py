@@ -0,0 +1,243 @@
+"""
+Times common client operations against a local StubServer and writes the
+results as JSON, so that runs from different commits can be compared.
+
+    python -m benchmarks.scenarios [--objects N] [--latency SECONDS]
+        [--shape small|wide] [--repeat N] [--only SCENARIO ...]
+        [--identity-map] [--output FILE] [--compare BASELINE]
+
+By default the client is used as configured out of the box, so that the
+results can be compared with older commits. --identity-map installs an
+IdentityMap for every run.
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from crust.api import Api
+from crust.fields import DateTimeField, Field, ToOneField
+from crust.resources import Resource
+
+from .server import StubServer
+
+
+class BenchApi(Api):
+    url = None
+    resources = {}
+
+
+class Category(Resource):
+    name = Field()
+
+    class Meta:
+        api = BenchApi
+
+
+class Item(Resource):
+    name = Field()
+    slug = Field()
+    price = Field()
+    active = Field()
+    created = DateTimeField()
+    category = ToOneField(Category)
+
+    class Meta:
+        api = BenchApi
+
+        # The data is reset outside of crust before each run, so the count
+        #   scenario must not reuse the total_count of the previous run.
+        count_ttl = 0
+
+
+SHAPES = {
+    # The number of extra text fields of each object and their length.
+    "small": (0, 0),
+    "wide": (20, 200),
+}
+
+CATEGORIES = 20
+
+
+def make_items(number, shape):
+    extra, size = SHAPES[shape]
+    start = datetime.datetime(2013, 1, 1)
+
+    for i in range(number):
+        item = {
+            "name": "Item %s" % i,
+            "slug": "item-%s" % i,
+            "price": "9.99",
+            "active": bool(i % 2),
+            "created": (start + datetime.timedelta(seconds=i * 37)).isoformat(),
+            "category": "/api/v1/category/%s/" % (i % CATEGORIES + 1),
+        }
+
+        for j in range(extra):
+            item["extra_%s" % j] = "x" * size
+
+        yield item
+
+
+def reset(server, options):
+    server.load("category", [{"name": "Category %s" % i} for i in range(CATEGORIES)])
+    server.load("item", make_items(options.objects, options.shape))
+
+
+def iterate(api, options):
+    return len(list(Item.objects.all()))
+
+
+def iterate_prefetch(api, options):
+    return len(list(Item.objects.prefetch(pages=4)))
+
+
+def slicing(api, options):
+    return len(list(Item.objects.all()[options.objects // 4:options.objects // 2]))
+
+
+def count(api, options):
+    Item.objects.count()
+    return 1
+
+
+def get(api, options):
+    for i in range(1, 51):
+        Item.objects.get(id=i)
+    return 50
+
+
+def save(api, options):
+    for i in range(1, 51):
+        item = Item(name="New %s" % i, slug="new-%s" % i, price="1.00", active=True, created=datetime.datetime(2013, 1, 1))
+        item.save()
+        item.price = "2.00"
+        item.save()
+    return 100
+
+
+def bulk_delete(api, options):
+    Item.objects.filter(active=True).delete()
+    return options.objects // 2
+
+
+def related(api, options):
+    # Resolves the category of every item, which with --identity-map is served
+    #   from the identity map once each category has been fetched.
+    return len(set(item.category.name for item in Item.objects.all()))
+
+
+SCENARIOS = [
+    ("iterate", iterate),
+    ("iterate_prefetch", iterate_prefetch),
+    ("slicing", slicing),
+    ("count", count),
+    ("get", get),
+    ("save", save),
+    ("bulk_delete", bulk_delete),
+    ("related", related),
+]
+
+
+def run(server, api, name, scenario, options):
+    timings = []
+    requests = []
+
+    for i in range(options.repeat):
+        reset(server, options)
+
+        if options.identity_map:
+            from crust.identity import IdentityMap
+            api.identity_map = IdentityMap(maxsize=options.objects * 2)
+
+        before = server.requests
+
+        start = time.perf_counter()
+        objects = scenario(api, options)
+        timings.append(time.perf_counter() - start)
+
+        requests.append(server.requests - before)
+
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "objects": objects,
+        "requests": requests[-1],
+        "objects_per_second": objects / min(timings) if min(timings) else None,
+    }
+
+
+def revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode("ascii").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """
+    Prints the change in the minimum time of each scenario from a baseline.
+    """
+    for name, result in sorted(results["scenarios"].items()):
+        before = baseline["scenarios"].get(name)
+
+        if before is None:
+            print("%-18s %10.4fs" % (name, result["min"]))
+        else:
+            change = (result["min"] - before["min"]) / before["min"] * 100
+            print("%-18s %10.4fs %10.4fs %+8.1f%%" % (name, before["min"], result["min"], change))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.scenarios")
+    parser.add_argument("--objects", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--shape", choices=sorted(SHAPES), default="small")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", choices=[name for name, scenario in SCENARIOS])
+    parser.add_argument("--identity-map", action="store_true")
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    options = parser.parse_args(argv[1:])
+
+    results = {
+        "revision": revision(),
+        "python": platform.python_version(),
+        "options": {
+            "objects": options.objects,
+            "latency": options.latency,
+            "shape": options.shape,
+            "repeat": options.repeat,
+            "identity_map": options.identity_map,
+        },
+        "scenarios": {},
+    }
+
+    with StubServer(latency=options.latency) as server:
+        api = BenchApi()
+        api.url = server.url
+
+        for name, scenario in SCENARIOS:
+            if options.only and name not in options.only:
+                continue
+
+            results["scenarios"][name] = run(server, api, name, scenario, options)
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if options.compare:
+        with open(options.compare) as f:
+            compare(results, json.load(f))
+    elif not options.output:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print("")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,194 @@
+"""
+An in-process HTTP server which speaks enough of the Tastypie protocol for
+the benchmarks: paginated list endpoints with a meta, filtering, detail and
+set/ endpoints, POST (with a Location), PUT, DELETE and bulk PATCH.
+
+    server = StubServer(latency=0.001)
+    server.load("item", [{"name": "a"}, ...])
+    server.start()
+    ...
+    server.stop()
+"""
+import json
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urljoin, urlparse
+
+
+class StubServer(object):
+    """
+    Serves resources under /api/v1/ from memory, sleeping 'latency' seconds
+    before each response. List endpoints return 'default_limit' objects unless
+    asked for more, and never more than 'max_limit'.
+    """
+
+    prefix = "/api/v1/"
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0, default_limit=20, max_limit=1000):
+        self.latency = latency
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+
+        self.data = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), self.handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return "http://%s:%s%s" % (host, port, self.prefix)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def load(self, resource_name, objects):
+        """
+        Replaces the objects of a resource, assigning ids and resource_uris.
+        """
+        with self.lock:
+            self.data[resource_name] = []
+
+            for obj in objects:
+                self._add(resource_name, obj)
+
+    def add(self, resource_name, obj):
+        with self.lock:
+            return self._add(resource_name, obj)
+
+    def _add(self, resource_name, obj):
+        objects = self.data.setdefault(resource_name, [])
+        pk = objects[-1]["id"] + 1 if objects else 1
+        obj = dict(obj, id=pk, resource_uri="%s%s/%s/" % (self.prefix, resource_name, pk))
+        objects.append(obj)
+
+        return obj
+
+    def handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            protocol_version = "HTTP/1.1"
+
+            # The headers and body are written separately, which would
+            #   otherwise stall on delayed ACKs with keep-alive connections.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def handle_method(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length).decode("utf-8")) if length else None
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                with server.lock:
+                    server.requests += 1
+                    status, payload, headers = server.route(self.command, self.path, body)
+                    content = json.dumps(payload).encode("utf-8") if payload is not None else b""
+
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                if payload is not None:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+
+                if self.command != "HEAD":
+                    self.wfile.write(content)
+
+            do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = handle_method
+
+        return Handler
+
+    def route(self, method, path, body):
+        """
+        Returns the status, payload and headers of the response to a request,
+        which is handled while holding the lock.
+        """
+        url = urlparse(path)
+        params = dict(parse_qsl(url.query))
+        parts = [p for p in url.path[len(self.prefix):].split("/") if p]
+
+        if not parts:
+            return 200, dict((name, {"list_endpoint": "%s%s/" % (self.prefix, name)}) for name in self.data), None
+
+        objects = self.data.setdefault(parts[0], [])
+
+        if method in ("GET", "HEAD") and len(parts) == 1:
+            offset = int(params.pop("offset", 0))
+            limit = int(params.pop("limit", self.default_limit))
+            limit = self.max_limit if limit == 0 else min(limit, self.max_limit)
+            params.pop("order_by", None)
+            params.pop("format", None)
+
+            matched = [o for o in objects if all(str(o.get(k)) == v for k, v in params.items())] if params else objects
+
+            return 200, {
+                "meta": {"total_count": len(matched), "offset": offset, "limit": limit},
+                "objects": matched[offset:offset + limit],
+            }, None
+
+        if method == "GET" and len(parts) == 3 and parts[1] == "set":
+            ids = set(int(i) for i in parts[2].split(";"))
+            found = [o for o in objects if o["id"] in ids]
+            return 200, {"objects": found, "not_found": sorted(ids - set(o["id"] for o in found))}, None
+
+        if len(parts) == 2:
+            matching = [o for o in objects if str(o["id"]) == parts[1]]
+
+            if method == "GET":
+                return (200, matching[0], None) if matching else (404, None, None)
+            if method == "PUT":
+                for obj in matching:
+                    obj.update(body)
+                return 204, None, None
+            if method == "DELETE":
+                self.data[parts[0]] = [o for o in objects if str(o["id"]) != parts[1]]
+                return 204, None, None
+
+        if method == "POST" and len(parts) == 1:
+            obj = self._add(parts[0], body)
+            return 201, None, {"Location": urljoin(self.url, obj["resource_uri"])}
+
+        if method == "PATCH" and len(parts) == 1:
+            deleted = set(urlparse(uri).path for uri in body.get("deleted_objects", []))
+            objects = self.data[parts[0]] = [o for o in objects if o["resource_uri"] not in deleted]
+            by_uri = dict((o["resource_uri"], o) for o in objects)
+            saved = []
+
+            for item in body.get("objects", []):
+                existing = by_uri.get(urlparse(item.get("resource_uri") or "").path)
+
+                if existing is not None:
+                    existing.update(item)
+                    saved.append(existing)
+                else:
+                    item.pop("resource_uri", None)
+                    saved.append(self._add(parts[0], item))
+
+            return 202, {"objects": saved}, None
+
+        return 405, None, None
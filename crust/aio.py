@@ -0,0 +1,433 @@
+"""
+asyncio support for crust.
+
+Resources bound to an AsyncApi are used exactly like normal resources, except
+that the methods which talk to the API return awaitables:
+
+    async for book in Book.objects.filter(author=1):
+        ...
+
+    count = await Book.objects.count()
+    book = await Book.objects.get(id=1)
+    book, created = await Book.objects.get_or_create(title="x")
+    await book.save()
+    await book.delete()
+
+Reading an attribute can't make a request, so related objects must be loaded
+before they are used, with either:
+
+    author = await resolve(book.author)
+
+or, for a related field of every result, in bulk with .prefetch_related().
+Related fields with lazy=False aren't supported.
+
+The operations which have no asynchronous equivalent, such as len(), slicing,
+exists(), bulk_create(), bulk_update(), delete() and export() of a QuerySet,
+raise a TypeError.
+"""
+import asyncio
+import urllib.parse as urllib_parse
+
+from . import requests
+from .api import Api
+from .exceptions import CircuitOpenError
+from .query import CHUNK_SIZE, ITER_CHUNK_SIZE
+from .resources import LazyResource
+from .utils import chunked, default_timer
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# The exceptions raised by a session when a request fails.
+if aiohttp is not None:
+    CLIENT_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+else:
+    CLIENT_ERRORS = (asyncio.TimeoutError,)
+
+
+class AsyncApi(Api):
+    """
+    An Api whose http_resource is a coroutine, backed by an aiohttp
+    ClientSession.
+    """
+
+    is_async = True
+
+    def create_session(self):
+        if aiohttp is None:
+            raise ImportError("AsyncApi requires aiohttp to be installed when no session is given.")
+
+        # An aiohttp ClientSession must be created within the event loop, so
+        #   it is created on the first request instead.
+        return None
+
+    def configure(self):
+        self.headers = self.default_headers()
+
+    def create_client_session(self):
+        """
+        Returns the aiohttp ClientSession used when none was given, configured
+        with the pool and timeout options of the Api.
+        """
+        connector = aiohttp.TCPConnector(limit=self.pool_maxsize, force_close=not self.keep_alive)
+
+        if isinstance(self.timeout, tuple):
+            timeout = aiohttp.ClientTimeout(connect=self.timeout[0], sock_read=self.timeout[1])
+        else:
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def warm_up(self, connections=None):
+        """
+        Opens connections to the API ahead of time, see Api.warm_up.
+        """
+        if connections is None:
+            connections = self.pool_maxsize
+
+        if self.session is None:
+            self.session = self.create_client_session()
+
+        async def head():
+            try:
+                async with self.session.request("HEAD", self.url, headers=self.headers):
+                    pass
+            except CLIENT_ERRORS:
+                return False
+            return True
+
+        return sum(await asyncio.gather(*[head() for i in range(connections)]))
+
+    async def close(self):
+        """
+        Closes the underlying session.
+        """
+        if self.session is not None:
+            await self.session.close()
+
+    async def http_resource(self, method, url, params=None, data=None):
+        """
+        Makes an HTTP request.
+        """
+        method, url, headers = self.prepare_request(method, url)
+
+        if self.single_flight is not None and method.upper() == "GET":
+            key = self.single_flight.key(method, url, params)
+            return await coalesce(self.single_flight, key, lambda: self._request(method, url, headers, params))
+
+        return await self._request(method, url, headers, params, data)
+
+    async def _request(self, method, url, headers, params=None, data=None):
+        key, entry = self.cache_lookup(method, url, params)
+
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                return entry.response
+
+            headers = dict(headers or {}, **entry.conditional_headers())
+
+        if self.session is None:
+            self.session = self.create_client_session()
+
+        headers = dict(self.headers, **(headers or {}))
+
+        try:
+            r = await self.send(method, url, params=params, data=data, headers=headers)
+        except CLIENT_ERRORS + (CircuitOpenError,):
+            if entry is not None and self.cache.stale_if_error:
+                return entry.response
+            raise
+
+        if entry is not None and r.status_code >= 500 and self.cache.stale_if_error:
+            return entry.response
+
+        return self.process_response(method, url, r, key, entry)
+
+    async def send(self, method, url, headers=None, **kwargs):
+        """
+        Sends a request with the session, see Api.send.
+        """
+        host = urllib_parse.urlparse(url).netloc
+        retry_method = (headers or {}).get("X-HTTP-Method-Override", method)
+        attempt = 0
+
+        while True:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before(host)
+
+            if self.rate_limiter is not None:
+                wait = self.rate_limiter.reserve(self.resource_root(url))
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+            start = default_timer()
+
+            try:
+                async with self.session.request(method, url, headers=headers, **kwargs) as resp:
+                    content = await resp.read()
+            except CLIENT_ERRORS as e:
+                if self.hooks:
+                    self.emit_request(method, url, None, default_timer() - start, e)
+
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.failure(host)
+
+                if self.retry is None or not self.retry.should_retry(retry_method, attempt, exception=e):
+                    raise
+
+                await asyncio.sleep(self.retry.backoff(attempt))
+                attempt += 1
+                continue
+
+            # Return the same kind of response object as the synchronous Api,
+            #   so that all code consuming responses works for both.
+            r = requests.Response()
+            r.status_code = resp.status
+            r.reason = resp.reason
+            r.url = str(resp.url)
+            r.headers.update(resp.headers)
+            r.encoding = resp.charset
+            r._content = content
+            r._content_consumed = True
+
+            if self.hooks:
+                self.emit_request(method, url, r, default_timer() - start)
+
+            if self.circuit_breaker is not None:
+                if self.circuit_breaker.is_failure(r):
+                    self.circuit_breaker.failure(host)
+                else:
+                    self.circuit_breaker.success(host)
+
+            if self.rate_limiter is not None:
+                self.rate_limiter.observe(self.resource_root(url), r)
+
+            if self.retry is None or not self.retry.should_retry(retry_method, attempt, response=r):
+                return r
+
+            await asyncio.sleep(self.retry.backoff(attempt, r))
+            attempt += 1
+
+
+async def coalesce(single_flight, key, fn):
+    """
+    Returns the result of awaiting fn(), or of the call for 'key' which is
+    already in flight, see SingleFlight.do.
+    """
+    task = single_flight.futures.get(key)
+
+    if task is None:
+        # The call runs as a task of its own, so that it finishes even if the
+        #   caller which started it is cancelled.
+        task = single_flight.futures[key] = asyncio.ensure_future(fn())
+
+        def done(task):
+            if single_flight.futures.get(key) is task:
+                del single_flight.futures[key]
+
+            # Mark the exception as retrieved, there may be nobody waiting.
+            if not task.cancelled():
+                task.exception()
+
+        task.add_done_callback(done)
+
+    # Shielded so that a cancelled caller doesn't cancel the call for
+    #   everyone else.
+    return await asyncio.shield(task)
+
+
+async def fetch_page(query, params):
+    api = query.resource._meta.api
+
+    r = await api.http_resource("GET", query.resource._meta.resource_name, params=params)
+    return api.deserialize_response(r)
+
+
+async def results(query, limit=None):
+    """
+    Yields the results from the API, see Query.results.
+    """
+    api = query.resource._meta.api
+    paginator = query.paginator(limit)
+    params = paginator.next_params()
+
+    started = default_timer()
+    pages = 0
+    num = 0
+
+    try:
+        while params is not None:
+            pages += 1
+            data = await fetch_page(query, params)
+
+            for item in paginator.consume(data):
+                num += 1
+                yield item
+
+            params = paginator.next_params()
+    finally:
+        if api.hooks:
+            api.emit("results", resource=query.resource._meta.resource_name, pages=pages, objects=num, seconds=default_timer() - started)
+
+
+async def iterator(queryset):
+    api = queryset.resource._meta.api
+    items = results(queryset.query)
+
+    if queryset.query.prefetch_related:
+        items = with_related_objects(queryset, items)
+
+    async for item in items:
+        if api.hooks:
+            start = default_timer()
+            obj = queryset._hydrate(item)
+            api.emit("hydrate", resource=queryset.resource._meta.resource_name, seconds=default_timer() - start)
+        else:
+            obj = queryset._hydrate(item)
+
+        yield obj
+
+
+async def with_related_objects(queryset, items):
+    """
+    Yields the 'items', with the objects of the related fields named in
+    query.prefetch_related fetched for every ITER_CHUNK_SIZE of them, see
+    QuerySet.prefetch_related.
+    """
+    chunk = []
+
+    async for item in items:
+        chunk.append(item)
+
+        if len(chunk) >= ITER_CHUNK_SIZE:
+            for prefetched in await prefetch_related_objects(queryset, chunk):
+                yield prefetched
+            chunk = []
+
+    for prefetched in await prefetch_related_objects(queryset, chunk):
+        yield prefetched
+
+
+async def prefetch_related_objects(queryset, items):
+    items = [item.copy() for item in items]
+
+    for name in queryset.query.prefetch_related:
+        field = queryset.resource._meta.fields[name]
+        uris = queryset._related_uris(items, field)
+
+        if uris:
+            queryset._replace_related(items, field, await in_bulk(field.resource_class.objects, uris))
+
+    return items
+
+
+async def in_bulk(queryset, uris):
+    api = queryset.resource._meta.api
+    objs, ids = queryset._in_bulk_known(uris)
+
+    for chunk in chunked(ids, CHUNK_SIZE):
+        url = "%s/set/%s/" % (queryset.resource._meta.resource_name, ";".join(chunk))
+        r = await api.http_resource("GET", url)
+        data = api.deserialize_response(r)
+
+        for item in data["objects"]:
+            obj = queryset._hydrate(item)
+            objs[obj.resource_uri] = obj
+
+    return dict([(uri, objs[uri]) for uri in uris if uri in objs])
+
+
+async def count(queryset):
+    if queryset._result_cache is not None and not queryset._iter:
+        return len(queryset._result_cache)
+
+    query = queryset.query
+    total_count = query.remembered_count()
+
+    if total_count is None:
+        data = await fetch_page(query, query.get_count_params())
+        total_count = data["meta"]["total_count"]
+
+        query.remember_count(total_count)
+
+    return query.clamp_count(total_count)
+
+
+async def get(queryset, *args, **kwargs):
+    clone = queryset.filter(*args, **kwargs)
+
+    if queryset.query.can_filter():
+        clone = clone.order_by()
+
+    objs = [obj async for obj in iterator(clone)]
+
+    return clone._get_single(objs, kwargs)
+
+
+async def get_or_create(queryset, **kwargs):
+    defaults = kwargs.pop("defaults", {})
+
+    try:
+        return await get(queryset, **kwargs), False
+    except queryset.resource.DoesNotExist:
+        params = dict(kwargs, **defaults)
+
+        return await create(queryset.resource(**params)), True
+
+
+async def resolve(value):
+    """
+    Returns the object a LazyResource stands for, fetching it unless it has
+    been already. Any other value is returned as is.
+    """
+    if not isinstance(value, LazyResource):
+        return value
+
+    state = value._lazy_state
+
+    if "obj" in state:
+        return state["obj"]
+
+    cls = state["cls"]
+    api = cls._meta.api
+
+    obj = api.identity_map.get(state["url"]) if api.identity_map is not None else None
+
+    if obj is None:
+        r = await api.http_resource("GET", state["url"])
+        obj = cls(**api.deserialize_response(r))
+
+    return value._lazy_become(obj)
+
+
+async def create(obj):
+    await save(obj, force_insert=True)
+    return obj
+
+
+async def save(obj, force_insert=False, force_update=False):
+    api = obj._meta.api
+
+    method, url, data = obj._get_save_request(force_insert, force_update)
+
+    resp = await api.http_resource(method, url, data=api.serialize(data))
+
+    url = obj._get_refresh_url(resp)
+
+    if url is None:
+        obj._update_identity_map()
+        return
+
+    resp = await api.http_resource("GET", url)
+    data = api.deserialize_response(resp)
+
+    # Update local values from the API Response
+    obj.__init__(**data)
+    obj._update_identity_map()
+
+
+async def delete(obj):
+    await obj._meta.api.http_resource("DELETE", obj.resource_uri)
+    obj._update_identity_map(deleted=True)
@@ -1,8 +1,11 @@
 import json
+import time
 
 from . import six
 from . import requests
-from .exceptions import ResponseError
+from . import serializers
+from .exceptions import CircuitOpenError, ResponseError
+from .utils import default_timer, thread_pool
 
 if six.PY3:
     import urllib.parse as urllib_parse
@@ -16,20 +19,110 @@ class Api(object):
 
     unsupported_methods = []
 
-    def __init__(self, session=None, *args, **kwargs):
+    # Whether http_resource returns an awaitable rather than a response.
+    is_async = False
+
+    # An optional IdentityMap, used so that each resource_uri is represented by
+    #   a single object.
+    identity_map = None
+
+    # An optional ResponseCache, used to cache and revalidate GET responses.
+    cache = None
+
+    # An optional RetryPolicy, used to retry requests which failed with a
+    #   connection error or a temporary error status.
+    retry = None
+
+    # An optional CircuitBreaker, used to fail fast while a host is down.
+    circuit_breaker = None
+
+    # An optional RateLimiter, used to stay within the request rate allowed
+    #   by the API.
+    rate_limiter = None
+
+    # An optional StatsCollector, which aggregates the events emitted.
+    stats = None
+
+    # An optional SingleFlight, used to share a single request between
+    #   concurrent identical GETs.
+    single_flight = None
+
+    # The content types to use, in order of preference. Requests are sent
+    #   using the first one which has a serializer registered, while all of
+    #   them are accepted in responses.
+    formats = ["application/json"]
+
+    serializers = serializers.registry
+
+    # The number of hosts to keep connection pools for, and the number of
+    #   connections kept open in each of them. If 'pool_block' is True a
+    #   request waits for a free connection rather than opening a new one
+    #   which is discarded afterwards.
+    pool_connections = 10
+    pool_maxsize = 10
+    pool_block = False
+
+    # Whether connections are kept open and reused between requests.
+    keep_alive = True
+
+    # The timeout of each request in seconds, either a single number or a
+    #   (connect, read) tuple. None waits forever.
+    timeout = None
+
+    def __init__(self, session=None, identity_map=None, cache=None, retry=None, circuit_breaker=None, rate_limiter=None, stats=None, single_flight=None, pool_connections=None, pool_maxsize=None, pool_block=None, keep_alive=None, timeout=None, *args, **kwargs):
         super(Api, self).__init__(*args, **kwargs)
 
+        if pool_connections is not None:
+            self.pool_connections = pool_connections
+        if pool_maxsize is not None:
+            self.pool_maxsize = pool_maxsize
+        if pool_block is not None:
+            self.pool_block = pool_block
+        if keep_alive is not None:
+            self.keep_alive = keep_alive
+        if timeout is not None:
+            self.timeout = timeout
+
         if session is None:
-            session = requests.session()
+            session = self.create_session()
 
         self.session = session
 
+        if identity_map is not None:
+            self.identity_map = identity_map
+        if cache is not None:
+            self.cache = cache
+
+        if retry is not None:
+            self.retry = retry
+        if circuit_breaker is not None:
+            self.circuit_breaker = circuit_breaker
+        if rate_limiter is not None:
+            self.rate_limiter = rate_limiter
+        if stats is not None:
+            self.stats = stats
+        if single_flight is not None:
+            self.single_flight = single_flight
+
+        # Maps the name of an event to the callbacks called with it.
+        self.hooks = {}
+
         self.unsupported_methods = [method.lower() for method in self.unsupported_methods]
 
+        self.formats = [content_type for content_type in self.formats if content_type in self.serializers]
+
+        if not self.formats:
+            raise ValueError("None of the formats of {0} have a serializer registered.".format(self.__class__.__name__))
+
+        self.serializer = self.serializers.get(self.formats[0])
+
         # Initialize the APIs
         for cls in self.resources.values():
             cls._meta.api = self
 
+        if self.stats is not None:
+            self.stats.install(self)
+
         self.configure()
 
     def __getattr__(self, name):
@@ -38,8 +131,129 @@ class Api(object):
 
         raise AttributeError("'{0}' object has no attribute '{1}'".format(self.__class__.__name__, name))
 
+    def create_session(self):
+        """
+        Returns the session used to make HTTP requests when none is given.
+        """
+        session = requests.session()
+
+        adapter = requests.adapters.HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                        pool_block=self.pool_block,
+                    )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        return session
+
     def configure(self):
-        self.session.headers.update({"Content-Type": "application/json", "Accept": "application/json"})
+        self.session.headers.update(self.default_headers())
+
+    def default_headers(self):
+        """
+        Returns the headers sent with every request, which negotiate the format
+        used with the API.
+        """
+        accept = []
+
+        for i, content_type in enumerate(self.formats):
+            if i:
+                content_type = "{0};q={1:.1f}".format(content_type, max(0.1, 1 - i / 10.0))
+            accept.append(content_type)
+
+        headers = {"Content-Type": self.serializer.content_type, "Accept": ", ".join(accept)}
+
+        if not self.keep_alive:
+            headers["Connection"] = "close"
+
+        return headers
+
+    def add_hook(self, event, callback):
+        """
+        Registers 'callback' to be called with the keyword arguments of each
+        'event' emitted. The events are:
+
+        request: method, url, resource, status (None if it failed), bytes,
+            seconds and error, for every request sent including retries.
+        deserialize: content_type, bytes and seconds.
+        hydrate: resource and seconds, for each object created when iterating
+            over a QuerySet.
+        results: resource, pages, objects and seconds, once the results of a
+            query have been consumed or the iteration abandoned.
+        """
+        self.hooks.setdefault(event, []).append(callback)
+
+    def remove_hook(self, event, callback):
+        callbacks = self.hooks.get(event, [])
+
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+        # Keep the dict empty when nothing is hooked, it is checked on every
+        #   hot path before doing any of the work to emit an event.
+        if not callbacks:
+            self.hooks.pop(event, None)
+
+    def emit(self, event, **info):
+        for callback in self.hooks.get(event, ()):
+            callback(**info)
+
+    def warm_up(self, connections=None):
+        """
+        Opens up to 'connections' (by default pool_maxsize) connections to the
+        API ahead of time by making concurrent HEAD requests, so that the first
+        requests made don't pay for DNS lookups and TLS handshakes. Returns the
+        number of requests which succeeded.
+        """
+        if connections is None:
+            connections = self.pool_maxsize
+
+        def head(i):
+            try:
+                self.session.request("HEAD", self.url, timeout=self.timeout)
+            except requests.RequestException:
+                return False
+            return True
+
+        if connections <= 1:
+            return sum(head(i) for i in range(connections))
+
+        with thread_pool(connections) as pool:
+            return sum(pool.map(head, range(connections)))
+
+    @classmethod
+    def from_schema(cls, url, cache_dir=None, ttl=24 * 60 * 60, *args, **kwargs):
+        """
+        Returns an instance of a new subclass of this Api for 'url', with a
+        Resource class generated for each resource in the schema published
+        by the API. If 'cache_dir' is given the schema is stored there and
+        only downloaded again once it is older than 'ttl' seconds, or used
+        regardless of its age if downloading it fails.
+        """
+        from .schema import SchemaCache, fetch_schemas, build_resources
+
+        api_class = type(cls)(cls.__name__, (cls,), {"url": url, "resources": {}})
+        api = api_class(*args, **kwargs)
+
+        cache = SchemaCache(cache_dir, ttl) if cache_dir is not None else None
+        schemas = cache.load(url) if cache is not None else None
+
+        if schemas is None:
+            try:
+                schemas = fetch_schemas(api)
+            except (requests.RequestException, ResponseError):
+                schemas = cache.load(url, stale=True) if cache is not None else None
+
+                if schemas is None:
+                    raise
+            else:
+                if cache is not None:
+                    cache.store(url, schemas)
+
+        build_resources(api, schemas)
+
+        return api
 
     @classmethod
     def bind(cls, resource):
@@ -66,11 +280,60 @@ class Api(object):
         except ValueError:
             raise ResponseError("The API Response was not valid.")
 
-    def http_resource(self, method, url, params=None, data=None):
+    def serialize(self, o):
+        """
+        Returns the serialization of given object, in the preferred format.
+        """
+        return self.serializer.dumps(o)
+
+    def deserialize(self, s, content_type=None):
+        """
+        Returns dict deserialization of a given string or bytes, in the given
+        format or else the preferred one.
+        """
+        serializer = self.serializers.get(content_type, self.serializer) if content_type else self.serializer
+
+        if self.hooks:
+            start = default_timer()
+
+        try:
+            data = serializer.loads(s)
+        except ValueError:
+            raise ResponseError("The API Response was not valid.")
+
+        if self.hooks:
+            self.emit("deserialize", content_type=serializer.content_type, bytes=len(s), seconds=default_timer() - start)
+
+        return data
+
+    def deserialize_response(self, r):
+        """
+        Returns the deserialized body of a response. Each call returns new
+        objects, since a response may be shared through the cache or by
+        concurrent requests and the objects end up in resources which may be
+        changed in place.
+        """
+        # Decode straight from the bytes, which avoids requests guessing the
+        #   charset and decoding the whole body to text first.
+        return self.deserialize(r.content, self.response_content_type(r))
+
+    @staticmethod
+    def response_content_type(r):
         """
-        Makes an HTTP request.
+        Returns the content type of a response without any parameters.
         """
+        content_type = r.headers.get("Content-Type")
+
+        if content_type is None:
+            return None
+
+        return content_type.split(";", 1)[0].strip().lower()
 
+    def prepare_request(self, method, url):
+        """
+        Returns the method, absolute url and extra headers to use when making a
+        request for the given method and (possibly relative) url.
+        """
         url = urllib_parse.urljoin(self.url, url)
         url = url if url.endswith("/") else url + "/"
 
@@ -80,8 +343,168 @@ class Api(object):
             headers = {"X-HTTP-Method-Override": method.upper()}
             method = "POST"
 
-        r = self.session.request(method, url, params=params, data=data, headers=headers)
+        return method, url, headers
+
+    def http_resource(self, method, url, params=None, data=None, stream=False):
+        """
+        Makes an HTTP request. If 'stream' is True the body of the response is
+        not downloaded up front and the response is never cached.
+        """
+        method, url, headers = self.prepare_request(method, url)
+
+        if self.single_flight is not None and method.upper() == "GET" and not stream:
+            key = self.single_flight.key(method, url, params)
+            return self.single_flight.do(key, lambda: self._request(method, url, headers, params))
+
+        return self._request(method, url, headers, params, data, stream)
+
+    def _request(self, method, url, headers, params=None, data=None, stream=False):
+        key, entry = self.cache_lookup(method, url, params) if not stream else (None, None)
+
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                return entry.response
+
+            headers = dict(headers or {}, **entry.conditional_headers())
+
+        try:
+            r = self.send(method, url, params=params, data=data, headers=headers, stream=stream)
+        except (requests.RequestException, CircuitOpenError):
+            if entry is not None and self.cache.stale_if_error:
+                return entry.response
+            raise
+
+        if entry is not None and r.status_code >= 500 and self.cache.stale_if_error:
+            return entry.response
+
+        return self.process_response(method, url, r, key, entry)
+
+    def send(self, method, url, headers=None, **kwargs):
+        """
+        Sends a request with the session, retrying it according to the retry
+        policy and consulting the circuit breaker and rate limiter. Returns the
+        last response.
+        """
+        host = urllib_parse.urlparse(url).netloc
+        retry_method = (headers or {}).get("X-HTTP-Method-Override", method)
+        attempt = 0
+
+        while True:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before(host)
+
+            if self.rate_limiter is not None:
+                wait = self.rate_limiter.reserve(self.resource_root(url))
+                if wait > 0:
+                    time.sleep(wait)
+
+            start = default_timer()
+
+            try:
+                r = self.session.request(method, url, headers=headers, timeout=self.timeout, **kwargs)
+            except requests.RequestException as e:
+                if self.hooks:
+                    self.emit_request(method, url, None, default_timer() - start, e)
+
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.failure(host)
+
+                if self.retry is None or not self.retry.should_retry(retry_method, attempt, exception=e):
+                    raise
+
+                time.sleep(self.retry.backoff(attempt))
+                attempt += 1
+                continue
+
+            if self.hooks:
+                self.emit_request(method, url, r, default_timer() - start)
+
+            if self.circuit_breaker is not None:
+                if self.circuit_breaker.is_failure(r):
+                    self.circuit_breaker.failure(host)
+                else:
+                    self.circuit_breaker.success(host)
+
+            if self.rate_limiter is not None:
+                self.rate_limiter.observe(self.resource_root(url), r)
+
+            if self.retry is None or not self.retry.should_retry(retry_method, attempt, response=r):
+                return r
+
+            time.sleep(self.retry.backoff(attempt, r))
+            attempt += 1
+            r.close()
+
+    def emit_request(self, method, url, r, seconds, error=None):
+        """
+        Emits the request event for a response, or for an error if 'r' is None.
+        """
+        if r is None:
+            status, size = None, 0
+        elif r._content_consumed:
+            status, size = r.status_code, len(r.content or b"")
+        else:
+            # Don't read the body of a streamed response.
+            status, size = r.status_code, int(r.headers.get("Content-Length") or 0)
+
+        self.emit(
+            "request",
+            method=method.upper(), url=url, resource=self.resource_name(url),
+            status=status, bytes=size, seconds=seconds, error=error,
+        )
+
+    def cache_lookup(self, method, url, params=None):
+        """
+        Returns the cache key and cached entry, if any, for a request.
+        """
+        if self.cache is None or method.upper() != "GET":
+            return None, None
+
+        key = self.cache.key(url, params)
+
+        return key, self.cache.get(key)
+
+    def process_response(self, method, url, r, key=None, entry=None):
+        """
+        Checks the response to a request and keeps the cache up to date with
+        it. Returns the response that should be used for the request.
+        """
+        if entry is not None and r.status_code == 304:
+            self.cache.revalidated(key, entry)
+            return entry.response
 
         r.raise_for_status()
 
+        if self.cache is not None:
+            if key is not None:
+                self.cache.set(key, r)
+            elif method.upper() != "GET":
+                self.cache.invalidate(self.resource_root(url))
+
+        if method.upper() != "GET":
+            resource = self.resources.get(self.resource_name(url))
+
+            # Any remembered counts of the resource may now be wrong.
+            if resource is not None:
+                resource._meta.writes += 1
+
         return r
+
+    def resource_name(self, url):
+        """
+        Returns the name of the resource that the given absolute url belongs to.
+        """
+        return self.resource_root(url).rstrip("/").rsplit("/", 1)[-1]
+
+    def resource_root(self, url):
+        """
+        Returns the absolute url of the list endpoint of the resource that the
+        given absolute url belongs to.
+        """
+        base = urllib_parse.urlparse(self.url).path
+        path = urllib_parse.urlparse(url).path
+
+        if path.startswith(base):
+            path = path[len(base):]
+
+        return urllib_parse.urljoin(self.url, path.lstrip("/").split("/", 1)[0] + "/")
@@ -0,0 +1,159 @@
+import threading
+import time
+
+from collections import OrderedDict
+
+from . import six
+
+if six.PY3:
+    import urllib.parse as urllib_parse
+else:
+    import urllib as urllib_parse
+
+
+class LRUCache(object):
+    """
+    A thread safe mapping which holds at most 'maxsize' items, discarding the
+    least recently used items first.
+    """
+
+    def __init__(self, maxsize=1000, *args, **kwargs):
+        super(LRUCache, self).__init__(*args, **kwargs)
+
+        self.maxsize = maxsize
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+
+            # Re-insert to mark the item as the most recently used.
+            self._data[key] = value
+
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def keys(self):
+        with self._lock:
+            return list(self._data.keys())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class CacheEntry(object):
+    """
+    A cached response along with the validators used to revalidate it.
+    """
+
+    def __init__(self, response, stored_at=None, *args, **kwargs):
+        super(CacheEntry, self).__init__(*args, **kwargs)
+
+        self.response = response
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        self.stored_at = time.time() if stored_at is None else stored_at
+
+    @property
+    def age(self):
+        return time.time() - self.stored_at
+
+    def conditional_headers(self):
+        """
+        Returns the headers used to ask the server whether the cached response
+        is still valid.
+        """
+        headers = {}
+
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+class ResponseCache(object):
+    """
+    Caches the responses of GET requests in a bounded LRU.
+
+    Cached responses are revalidated with the server using If-None-Match and
+    If-Modified-Since, unless they are younger than 'max_age' seconds, in
+    which case they are used without making a request at all. Only responses
+    which carry an ETag or Last-Modified header are cached unless 'max_age' is
+    set. If 'stale_if_error' is True a cached response is used, however old,
+    when the API can't be reached or fails with a 5xx.
+    """
+
+    def __init__(self, maxsize=1000, max_age=0, stale_if_error=False, *args, **kwargs):
+        super(ResponseCache, self).__init__(*args, **kwargs)
+
+        self.max_age = max_age
+        self.stale_if_error = stale_if_error
+
+        self._entries = LRUCache(maxsize)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(url, params=None):
+        if not params:
+            return url
+        return url + "?" + urllib_parse.urlencode(sorted(params.items()))
+
+    def get(self, key):
+        """
+        Returns the CacheEntry for 'key', or None if there isn't one.
+        """
+        return self._entries.get(key)
+
+    def is_fresh(self, entry):
+        """
+        Returns True if 'entry' can be used without revalidating it.
+        """
+        return entry.age < self.max_age
+
+    def set(self, key, response):
+        if self.max_age or "ETag" in response.headers or "Last-Modified" in response.headers:
+            self._entries.set(key, CacheEntry(response))
+
+    def revalidated(self, key, entry):
+        """
+        Called when the server has confirmed that 'entry' is still valid.
+        """
+        entry.stored_at = time.time()
+
+    def invalidate(self, prefix):
+        """
+        Discards every entry whose url starts with 'prefix'.
+        """
+        for key in self._entries.keys():
+            if key.startswith(prefix):
+                self._entries.pop(key)
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,120 @@
+"""
+Functions to parse the ISO 8601 date and time strings returned by the API.
+
+Each function returns None when the string isn't well formatted.
+"""
+import datetime
+import re
+
+from .utils import fixed_offset
+
+
+DATE_REGEX = re.compile(r"^(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})$")
+
+TIME_REGEX = re.compile(
+    r"^(?P<hour>\d{1,2}):(?P<minute>\d{1,2})"
+    r"(?::(?P<second>\d{1,2})(?:[.,](?P<microsecond>\d+))?)?$"
+)
+
+DATETIME_REGEX = re.compile(
+    r"^(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})"
+    r"(?:T|\s+)(?P<hour>\d{1,2}):(?P<minute>\d{1,2})"
+    r"(?::(?P<second>\d{1,2})(?:[.,](?P<microsecond>\d+))?)?"
+    r"\s*(?P<tzinfo>Z|[+-]\d{2}(?::?\d{2})?)?$"
+)
+
+# datetime.fromisoformat and friends are implemented in C and are much faster
+#   than any regex, but they are not available before Python 3.7.
+fromisoformat = getattr(datetime.datetime, "fromisoformat", None)
+date_fromisoformat = getattr(datetime.date, "fromisoformat", None)
+time_fromisoformat = getattr(datetime.time, "fromisoformat", None)
+
+
+def parse_date(value):
+    """
+    Parses a string such as "2013-01-02" and returns a datetime.date.
+    """
+    if date_fromisoformat is not None:
+        try:
+            return date_fromisoformat(value)
+        except ValueError:
+            pass
+
+    match = DATE_REGEX.match(value)
+
+    if match is None:
+        return None
+
+    try:
+        return datetime.date(*[int(v) for v in match.groups()])
+    except ValueError:
+        return None
+
+
+def parse_time(value):
+    """
+    Parses a string such as "03:04:05.123456" and returns a datetime.time.
+    """
+    if time_fromisoformat is not None:
+        try:
+            return time_fromisoformat(value)
+        except ValueError:
+            pass
+
+    match = TIME_REGEX.match(value)
+
+    if match is None:
+        return None
+
+    data = match.groupdict()
+
+    try:
+        return datetime.time(
+            int(data["hour"]), int(data["minute"]), int(data["second"] or 0),
+            _microsecond(data["microsecond"]),
+        )
+    except ValueError:
+        return None
+
+
+def parse_datetime(value):
+    """
+    Parses a string such as "2013-01-02T03:04:05.123456+01:00" and returns a
+    datetime.datetime, which is timezone aware if the string has a UTC offset.
+    """
+    if fromisoformat is not None:
+        try:
+            return fromisoformat(value)
+        except ValueError:
+            pass
+
+    match = DATETIME_REGEX.match(value)
+
+    if match is None:
+        return None
+
+    data = match.groupdict()
+
+    tzinfo = data["tzinfo"]
+    if tzinfo is not None:
+        if tzinfo == "Z":
+            tzinfo = fixed_offset(0)
+        else:
+            digits = tzinfo[1:].replace(":", "")
+            minutes = int(digits[:2]) * 60 + int(digits[2:] or 0)
+            tzinfo = fixed_offset(-minutes if tzinfo[0] == "-" else minutes)
+
+    try:
+        return datetime.datetime(
+            int(data["year"]), int(data["month"]), int(data["day"]),
+            int(data["hour"]), int(data["minute"]), int(data["second"] or 0),
+            _microsecond(data["microsecond"]), tzinfo,
+        )
+    except ValueError:
+        return None
+
+
+def _microsecond(fraction):
+    if not fraction:
+        return 0
+    return int(fraction[:6].ljust(6, "0"))
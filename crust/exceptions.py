@@ -20,3 +20,9 @@ class FieldError(ValueError):
     """
     There was an error proccessing a Field.
     """
+
+
+class CircuitOpenError(Exception):
+    """
+    A request wasn't made since the host has been failing repeatedly.
+    """
@@ -0,0 +1,117 @@
+import codecs
+import csv
+import gzip as gzip_module
+import io
+import json
+
+from . import six
+
+
+# The number of objects written between calls of the progress callback.
+PROGRESS_EVERY = 1000
+
+
+def open_output(fileobj, compress=False):
+    """
+    Returns a text stream writing to 'fileobj', which is compressed with gzip
+    if 'compress' is True, along with a function that finishes the output.
+    Text files are written to directly, binary files as UTF-8.
+    """
+    if isinstance(fileobj, io.TextIOBase):
+        if compress:
+            raise ValueError("Compressed output must be written to a file opened in binary mode.")
+        return fileobj, fileobj.flush
+
+    binary = gzip_module.GzipFile(fileobj=fileobj, mode="wb") if compress else fileobj
+    stream = codecs.getwriter("utf-8")(binary)
+
+    def finish():
+        stream.flush()
+        if compress:
+            # Writes the gzip trailer, without closing fileobj.
+            binary.close()
+
+    return stream, finish
+
+
+def ndjson_writer(stream, fields):
+    encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+    def write(item):
+        if fields is not None:
+            item = dict((name, item.get(name)) for name in fields)
+        stream.write(encoder.encode(item))
+        stream.write(u"\n")
+
+    return write
+
+
+def csv_writer(stream, fields):
+    if fields is None:
+        raise ValueError("CSV output requires the fields to write.")
+
+    if six.PY3:
+        writerow = csv.writer(stream, lineterminator="\n").writerow
+    else:
+        # The csv module of Python 2 only writes bytes.
+        buf = io.BytesIO()
+        writer = csv.writer(buf, lineterminator="\n")
+
+        def writerow(row):
+            writer.writerow([six.text_type(value).encode("utf-8") for value in row])
+            stream.write(buf.getvalue().decode("utf-8"))
+            buf.seek(0)
+            buf.truncate()
+
+    def cell(value):
+        if value is None:
+            return ""
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, separators=(",", ":"))
+        return value
+
+    def write(item):
+        writerow([cell(item.get(name)) for name in fields])
+
+    writerow(fields)
+
+    return write
+
+
+WRITERS = {
+    "ndjson": ndjson_writer,
+    "csv": csv_writer,
+}
+
+
+def export(results, fileobj, format="ndjson", fields=None, gzip=False, progress=None):
+    """
+    Writes each of the raw objects from 'results' to 'fileobj' as 'format',
+    restricted to 'fields' if given, and returns the number written. If
+    'progress' is given it is called with the number written so far every
+    PROGRESS_EVERY objects and once at the end.
+    """
+    try:
+        make_writer = WRITERS[format]
+    except KeyError:
+        raise ValueError("Unknown export format %r, expected one of %s." % (format, ", ".join(sorted(WRITERS))))
+
+    stream, finish = open_output(fileobj, gzip)
+    write = make_writer(stream, fields)
+
+    num = 0
+
+    try:
+        for item in results:
+            write(item)
+            num += 1
+
+            if progress is not None and not num % PROGRESS_EVERY:
+                progress(num)
+    finally:
+        finish()
+
+    if progress is not None:
+        progress(num)
+
+    return num
@@ -2,11 +2,13 @@ import datetime
 import importlib
 import re
 
+from . import dateparse
 from . import six
 from .exceptions import FieldError
+from .utils import require_sync
 
 
-DATETIME_REGEX = re.compile('^(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})(T|\s+)(?P<hour>\d{2}):(?P<minute>\d{2}):(?P<second>\d{2}).*?$')
+DATETIME_REGEX = re.compile(r'^(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})(T|\s+)(?P<hour>\d{2}):(?P<minute>\d{2}):(?P<second>\d{2}).*?$')
 
 
 class Field(object):
@@ -34,9 +36,48 @@ class Field(object):
 
 
 class DateTimeField(Field):
+    """
+    A field holding a datetime.datetime, which is timezone aware if the API
+    includes a UTC offset.
+
+    If 'cache_size' is given the most recently parsed strings, up to that
+    many, are remembered, which saves parsing the same value repeatedly.
+    """
+
+    def __init__(self, *args, **kwargs):
+        # Taken as a keyword only, so that the name can still be given first.
+        self.cache_size = kwargs.pop("cache_size", None)
+        self._cache = {}
+
+        super(DateTimeField, self).__init__(*args, **kwargs)
 
     def hydrate(self, value):
         if isinstance(value, six.string_types):
+            if self.cache_size:
+                parsed = self._cache.get(value)
+
+                if parsed is not None:
+                    return parsed
+
+            parsed = self.parse(value)
+
+            if self.cache_size:
+                # The values are immutable so they can be shared, and simply
+                #   starting over when full is cheaper than tracking usage.
+                if len(self._cache) >= self.cache_size:
+                    self._cache.clear()
+                self._cache[value] = parsed
+
+            return parsed
+
+        return value
+
+    def parse(self, value):
+        parsed = dateparse.parse_datetime(value)
+
+        if parsed is None:
+            # Fall back to the lenient format, which ignores anything after the
+            #   seconds.
             match = DATETIME_REGEX.search(value)
 
             if match:
@@ -45,7 +86,7 @@ class DateTimeField(Field):
             else:
                 raise FieldError("Datetime provided to '%s' field doesn't appear to be a valid datetime string: '%s'" % (self.name, value))
 
-        return value
+        return parsed
 
     def dehydrate(self, value):
         if isinstance(value, datetime.datetime):
@@ -54,6 +95,53 @@ class DateTimeField(Field):
         return value
 
 
+class DateField(DateTimeField):
+    """
+    A field holding a datetime.date.
+    """
+
+    def parse(self, value):
+        parsed = dateparse.parse_date(value)
+
+        if parsed is None:
+            # Accept datetimes too, as Tastypie serializes a DateField which
+            #   wraps a model DateTimeField as one.
+            parsed = dateparse.parse_datetime(value)
+
+            if parsed is None:
+                raise FieldError("Date provided to '%s' field doesn't appear to be a valid date string: '%s'" % (self.name, value))
+
+            parsed = parsed.date()
+
+        return parsed
+
+    def dehydrate(self, value):
+        if isinstance(value, datetime.date):
+            return value.isoformat()
+
+        return value
+
+
+class TimeField(DateTimeField):
+    """
+    A field holding a datetime.time.
+    """
+
+    def parse(self, value):
+        parsed = dateparse.parse_time(value)
+
+        if parsed is None:
+            raise FieldError("Time provided to '%s' field doesn't appear to be a valid time string: '%s'" % (self.name, value))
+
+        return parsed
+
+    def dehydrate(self, value):
+        if isinstance(value, datetime.time):
+            return value.isoformat()
+
+        return value
+
+
 class RelatedField(Field):
 
     def __init__(self, resource, lazy=True, *args, **kwargs):
@@ -71,23 +159,44 @@ class RelatedField(Field):
 
         return self._resource
 
-
-class ToOneField(RelatedField):
-
-    def hydrate(self, value):
-        if value is None:
-            return value
-
+    def resolve(self, value):
+        """
+        Returns the object for a single related resource_uri, reusing the one
+        held by the api's identity map if there is one.
+        """
         if isinstance(value, self.resource_class):
             return value
 
+        api = self.resource_class._meta.api
+
+        if api.identity_map is not None:
+            obj = api.identity_map.get(value)
+            if obj is not None:
+                return obj
+
         if self.lazy:
             from .resources import LazyResource
             return LazyResource(self.resource_class, value)
         else:
-            r = self.resource_class._meta.api.http_resource("GET", value)
-            data = self.resource_class._meta.api.resource_deserialize(r.text)
-            return self.resource_class(**data)
+            require_sync(api, "A related field with lazy=False")
+
+            r = api.http_resource("GET", value)
+            data = api.deserialize_response(r)
+            obj = self.resource_class(**data)
+
+            if api.identity_map is not None:
+                api.identity_map.add(obj)
+
+            return obj
+
+
+class ToOneField(RelatedField):
+
+    def hydrate(self, value):
+        if value is None:
+            return value
+
+        return self.resolve(value)
 
     def dehydrate(self, value):
         from .resources import LazyResource
@@ -110,18 +219,7 @@ class ToManyField(RelatedField):
         if value is None:
             return value
 
-        if self.lazy:
-            from .resources import LazyResource
-            return [LazyResource(self.resource_class, url) for url in value]
-        else:
-            hydrated = []
-
-            for url in value:
-                r = self.resource_class._meta.api.http_resource("GET", url)
-                data = self.resource_class._meta.api.resource_deserialize(r.text)
-                hydrated.append(self.resource_class(**data))
-
-            return hydrated
+        return [self.resolve(url) for url in value]
 
     def dehydrate(self, value):
         from .resources import LazyResource
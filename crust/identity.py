@@ -0,0 +1,113 @@
+import threading
+import time
+import weakref
+
+from collections import OrderedDict
+
+from . import six
+
+if six.PY3:
+    import urllib.parse as urllib_parse
+else:
+    import urlparse as urllib_parse
+
+
+class IdentityMap(object):
+    """
+    Maps resource_uris to the single object that represents them.
+
+    Objects are held by weak references, so the map never keeps an object
+    alive by itself. The number of entries is bounded by 'maxsize', evicting
+    the least recently used entries first, and entries older than 'ttl'
+    seconds are forgotten.
+
+    An object already in the map is returned as it is when it is loaded again,
+    keeping any unsaved changes made to it. With 'refresh' it is updated with
+    the newly loaded data instead.
+    """
+
+    def __init__(self, maxsize=1000, ttl=None, refresh=False, *args, **kwargs):
+        super(IdentityMap, self).__init__(*args, **kwargs)
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.refresh = refresh
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(uri):
+        # resource_uris may be given as absolute urls (e.g. from a Location
+        #   header) or as paths, so key on the path alone.
+        return urllib_parse.urlparse(uri).path
+
+    def get(self, uri):
+        """
+        Returns the object for the given uri, or None if it isn't known.
+        """
+        key = self.key(uri)
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+            if entry is None:
+                return None
+
+            stored, ref = entry
+            obj = ref()
+
+            if obj is None or (self.ttl is not None and time.time() - stored > self.ttl):
+                return None
+
+            # Re-insert to mark the entry as the most recently used.
+            self._entries[key] = entry
+
+            return obj
+
+    def add(self, obj):
+        """
+        Records 'obj' as the object for its resource_uri.
+        """
+        if obj.resource_uri is None:
+            return
+
+        key = self.key(obj.resource_uri)
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time(), weakref.ref(obj))
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, uri):
+        """
+        Forgets the object for the given uri, if any.
+        """
+        with self._lock:
+            self._entries.pop(self.key(uri), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def hydrate(self, cls, data):
+        """
+        Returns the object for the resource_uri in 'data', updated with it if
+        'refresh' is set, or a newly created 'cls' instance if there is none.
+        """
+        uri = data.get("resource_uri")
+        obj = self.get(uri) if uri is not None else None
+
+        if obj is not None and obj.__class__ is cls:
+            if self.refresh:
+                obj.__init__(**data)
+        else:
+            obj = cls(**data)
+            self.add(obj)
+
+        return obj
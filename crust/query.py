@@ -1,6 +1,12 @@
+import collections
 import copy
+import time
 
 from . import six
+from .exceptions import ResponseError
+from .fields import RelatedField, ToManyField
+from .streaming import DecodedPage, StreamingPage, STREAM_CHUNK_SIZE
+from .utils import chunked, default_timer, require_sync, thread_pool
 
 
 # Used to control how many objects are worked with at once in some cases (e.g.
@@ -8,6 +14,9 @@ from . import six
 CHUNK_SIZE = 100
 ITER_CHUNK_SIZE = CHUNK_SIZE
 
+# The number of objects requested per page unless told otherwise.
+PAGE_SIZE = 100
+
 # The maximum number of items to display in a QuerySet.__repr__
 REPR_OUTPUT_SIZE = 20
 
@@ -16,6 +25,236 @@ class Empty(object):
     pass
 
 
+class AdaptiveLimit(object):
+    """
+    Adjusts the number of objects requested per page from the observed time
+    taken by, and size of, the previous page, aiming for pages which take
+    about 'target_seconds' and are about 'target_bytes' large. The limit stays
+    between 'min_limit' and 'max_limit', and changes by at most 'factor'
+    between pages.
+    """
+
+    def __init__(self, min_limit=20, max_limit=1000, target_seconds=1.0, target_bytes=1024 * 1024, factor=2, *args, **kwargs):
+        super(AdaptiveLimit, self).__init__(*args, **kwargs)
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_seconds = target_seconds
+        self.target_bytes = target_bytes
+        self.factor = factor
+
+    def next_limit(self, limit, num, seconds=None, nbytes=None):
+        """
+        Returns the limit to use for the next page, given that the last one
+        requested 'limit' objects and returned 'num' of them.
+        """
+        if not num:
+            return limit
+
+        ideal = []
+
+        # The fixed cost of a request is attributed to the objects as well,
+        #   which errs on the side of growing small pages slowly.
+        if seconds:
+            ideal.append(self.target_seconds / (float(seconds) / num))
+        if nbytes:
+            ideal.append(self.target_bytes / (float(nbytes) / num))
+
+        if not ideal:
+            return limit
+
+        new = max(limit / float(self.factor), min(limit * self.factor, min(ideal)))
+
+        return int(max(self.min_limit, min(self.max_limit, new)))
+
+
+class Paginator(object):
+    """
+    Tracks the offset and limit while paging through the results of a Query.
+
+    The params for each page are obtained from next_params() and the
+    deserialized response for that page must then be passed to consume(). This
+    keeps the pagination rules independent of how the pages are fetched.
+    """
+
+    def __init__(self, query, limit=None, *args, **kwargs):
+        super(Paginator, self).__init__(*args, **kwargs)
+
+        if limit is None:
+            limit = query.page_size if query.page_size is not None else PAGE_SIZE
+
+        self.query = query
+        self.options = query.resource._meta
+        self.adaptive = query.adaptive
+
+        # A limit of 0 asks the API for as many objects as it allows.
+        if self.options.max_limit and (limit > self.options.max_limit or (limit == 0 and self.adaptive is not None)):
+            limit = self.options.max_limit
+        elif limit == 0 and self.adaptive is not None:
+            limit = self.adaptive.max_limit
+
+        self.limit = limit
+        self.low_mark = query.low_mark
+        self.limited = True if query.high_mark is not None else False
+
+        self.rmax = query.high_mark - query.low_mark if self.limited else None
+        self.rnum = 0
+        self.exhausted = False
+
+        self.params = query.get_params()
+        self.params["offset"] = query.low_mark
+        self.params["limit"] = limit
+
+    @property
+    def remaining(self):
+        """
+        The number of results still to be fetched, or None if it isn't known
+        yet.
+        """
+        if self.rmax is None:
+            return None
+        return max(0, self.rmax - self.rnum)
+
+    def next_params(self):
+        """
+        Returns the params for the next page, or None if there are no more
+        pages to fetch.
+        """
+        if self.exhausted or self.remaining == 0:
+            return None
+
+        if self.rmax is not None:
+            if self.limit:
+                self.params["limit"] = min(self.remaining, self.limit)
+            else:
+                self.params["limit"] = self.remaining if self.limited else 0
+
+        return self.params.copy()
+
+    def consume(self, data, seconds=None, nbytes=None):
+        """
+        Updates the pagination state from a page of data, which took 'seconds'
+        to fetch and was 'nbytes' large, and returns the objects contained in
+        it.
+        """
+        self.update(data["meta"], len(data["objects"]), seconds, nbytes)
+
+        return data["objects"]
+
+    def update(self, meta, num, seconds=None, nbytes=None):
+        """
+        Updates the pagination state from the meta of a page which contained
+        'num' objects. Returns the meta.
+        """
+        if meta is None:
+            raise ResponseError("The API Response did not include the pagination meta.")
+
+        self.adjust_limit(meta, num, seconds, nbytes)
+
+        self.query.remember_count(meta["total_count"])
+
+        # total_count ignores offset and limit, so adjust it to the number of
+        #   results available from our low_mark.
+        available = max(0, meta["total_count"] - self.low_mark)
+
+        if self.rmax is None or available < self.rmax:
+            self.rmax = available
+
+        self.params["offset"] = meta["offset"] + meta["limit"]
+
+        # Guard against looping forever if the results shrink underneath us.
+        if not num:
+            self.exhausted = True
+
+        self.rnum += num
+
+        return meta
+
+    def adjust_limit(self, meta, num, seconds=None, nbytes=None):
+        """
+        Adjusts the limit used for the next page after a page of 'num' objects.
+        """
+        # If the API returned a smaller limit than the one requested it has
+        #   been clamped to the max_limit of the resource, so remember it.
+        requested = self.params["limit"]
+
+        if meta["limit"] and (requested == 0 or meta["limit"] < requested):
+            self.options.max_limit = meta["limit"]
+
+            if self.limit > meta["limit"]:
+                self.limit = meta["limit"]
+
+        if self.adaptive is not None:
+            self.limit = self.adaptive.next_limit(self.limit, num, seconds, nbytes)
+
+            if self.options.max_limit:
+                self.limit = min(self.limit, self.options.max_limit)
+
+
+class KeysetPaginator(Paginator):
+    """
+    Pages through the results of an ordered query by filtering on the value
+    of the ordering field of the last object received (e.g. id__gt=<last id>)
+    rather than by offset, so each page costs the API the same however deep
+    it is and rows inserted meanwhile don't shift the pages.
+
+    The ordering field must be unique, otherwise objects sharing the value at
+    the end of a page are skipped.
+    """
+
+    def __init__(self, query, limit=None, *args, **kwargs):
+        super(KeysetPaginator, self).__init__(query, limit, *args, **kwargs)
+
+        if not query.order_by:
+            raise ValueError("Keyset pagination requires an ordered query.")
+
+        self.field = query.order_by.lstrip("-")
+        self.lookup = "{0}__{1}".format(self.field, "lt" if query.order_by.startswith("-") else "gt")
+        self.last = None
+        self.first = True
+
+    def consume(self, data, seconds=None, nbytes=None):
+        if data["objects"]:
+            self.last = data["objects"][-1].get(self.field)
+
+            # Without the value the next page can't be requested, and stopping
+            #   here would silently truncate the results.
+            if self.last is None:
+                raise ResponseError("The API Response did not include the '%s' field used for keyset pagination." % self.field)
+
+        return super(KeysetPaginator, self).consume(data, seconds, nbytes)
+
+    def update(self, meta, num, seconds=None, nbytes=None):
+        if meta is None:
+            raise ResponseError("The API Response did not include the pagination meta.")
+
+        self.adjust_limit(meta, num, seconds, nbytes)
+
+        if self.first:
+            # Only the first page uses an offset, for the low_mark.
+            self.query.remember_count(meta["total_count"])
+            available = max(0, meta["total_count"] - self.low_mark)
+            self.first = False
+        else:
+            # The total_count is of the objects after the previous page.
+            available = self.rnum + meta["total_count"]
+
+        if self.rmax is None or available < self.rmax:
+            self.rmax = available
+
+        self.params["offset"] = 0
+
+        if self.last is not None:
+            self.params[self.lookup] = self.last
+
+        if not num:
+            self.exhausted = True
+
+        self.rnum += num
+
+        return meta
+
+
 class Query(object):
     """
     A single API query.
@@ -32,6 +271,33 @@ class Query(object):
         self.low_mark = 0
         self.high_mark = None
 
+        # The number of objects to request per page, None for the default and
+        #   0 for as many as the API allows.
+        self.page_size = None
+
+        # An optional AdaptiveLimit which adjusts the page size as it goes.
+        self.adaptive = None
+
+        # Number of pages to fetch ahead in the background, 0 disables it.
+        self.prefetch_pages = 0
+
+        # Whether pages are decoded incrementally while they are downloaded.
+        self.streaming = False
+
+        # Names of related fields whose objects are fetched in bulk.
+        self.prefetch_related = ()
+
+        # The last total_count seen for the filters, as (total_count, time,
+        #   number of writes to the resource at the time).
+        self.known_count = None
+
+        # Whether len() of a QuerySet is the count reported by the API.
+        self.server_len = False
+
+        # Whether to page by the value of the ordering field rather than by
+        #   offset, see KeysetPaginator.
+        self.keyset = False
+
     def clone(self, klass=None, memo=None, **kwargs):
         """
         Creates a copy of the current instance. The 'kwargs' parameter can be
@@ -48,6 +314,15 @@ class Query(object):
         obj.low_mark = self.low_mark
         obj.high_mark = self.high_mark
 
+        obj.page_size = self.page_size
+        obj.adaptive = self.adaptive
+        obj.prefetch_pages = self.prefetch_pages
+        obj.streaming = self.streaming
+        obj.prefetch_related = self.prefetch_related
+        obj.known_count = self.known_count
+        obj.server_len = self.server_len
+        obj.keyset = self.keyset
+
         obj.__dict__.update(kwargs)
 
         return obj
@@ -57,6 +332,7 @@ class Query(object):
         Adjusts the filters that should be applied to the request to the API.
         """
         self.filters.update(filters)
+        self.known_count = None
 
     def add_ordering(self, ordering=None):
         """
@@ -98,47 +374,202 @@ class Query(object):
             else:
                 self.low_mark = self.low_mark + low
 
-    def results(self, limit=100):
+    def results(self, limit=None):
         """
         Yields the results from the API, efficiently handling the pagination and
         properly passing all paramaters.
         """
-        limited = True if self.high_mark is not None else False
-        rmax = self.high_mark - self.low_mark if limited else None
-        rnum = 0
+        api = self.resource._meta.api
+        require_sync(api, "Iterating over a QuerySet")
 
-        params = self.get_params()
-        params["offset"] = self.low_mark
-        params["limit"] = limit
+        paginator = self.paginator(limit)
+        params = paginator.next_params()
 
-        while not limited and rmax is None or rnum < rmax:
-            if limited or rmax is not None:
-                rleft = rmax - rnum
-                params["limit"] = rleft if rleft < limit else limit
+        started = default_timer()
+        pages = 0
+        num = 0
 
-            r = self.resource._meta.api.http_resource("GET", self.resource._meta.resource_name, params=params)
-            data = self.resource._meta.api.resource_deserialize(r.text)
+        try:
+            while params is not None:
+                pages += 1
 
-            if not limited:
-                rmax = data["meta"]["total_count"]
+                # A keyset needs the last object of a page before requesting
+                #   the next, so isn't combined with streaming or prefetching.
+                if self.streaming and not isinstance(paginator, KeysetPaginator):
+                    page = self.stream_page(params)
+                    page_num = 0
 
-            if data["meta"]["total_count"] < rmax:
-                rmax = data["meta"]["total_count"]
+                    for item in page:
+                        page_num += 1
+                        yield item
 
-            params["offset"] = data["meta"]["offset"] + data["meta"]["limit"]
+                    num += page_num
 
-            for item in data["objects"]:
-                rnum += 1
-                yield item
+                    # The time taken includes consuming the objects, so only
+                    #   the size of a streamed page is taken into account.
+                    meta = paginator.update(page.meta, page_num, nbytes=page.bytes_read)
+                else:
+                    start = time.time()
+                    r = self.fetch_response(params)
+                    data = api.deserialize_response(r)
+                    meta = data["meta"]
+
+                    for item in paginator.consume(data, time.time() - start, len(r.content)):
+                        num += 1
+                        yield item
+
+                if self.prefetch_pages and paginator.remaining and not isinstance(paginator, KeysetPaginator):
+                    # Now that the total_count is known, the remaining offset
+                    #   windows can be fetched ahead of time.
+                    page_size = meta["limit"] or paginator.limit
+                    pages += -(-paginator.remaining // page_size)
+
+                    for item in self.prefetched_results(paginator.params, paginator.remaining, page_size):
+                        num += 1
+                        yield item
+
+                    return
+
+                params = paginator.next_params()
+        finally:
+            if api.hooks:
+                api.emit("results", resource=self.resource._meta.resource_name, pages=pages, objects=num, seconds=default_timer() - started)
+
+    def paginator(self, limit=None):
+        """
+        Returns the Paginator used to page through the results. Keyset
+        pagination is only used while the query is ordered, since get(),
+        exists() and delete() clear the ordering.
+        """
+        if self.keyset and self.order_by:
+            return KeysetPaginator(self, limit)
+
+        return Paginator(self, limit)
+
+    def prefetched_results(self, params, remaining, page_size):
+        """
+        Yields 'remaining' results starting at params["offset"], fetching up to
+        self.prefetch_pages pages ahead of the one being consumed through a
+        bounded pool of worker threads. Pages are still yielded in order.
+        """
+        offset = params["offset"]
+        end = offset + remaining
+
+        pending = collections.deque()
+        pool = thread_pool(self.prefetch_pages)
+
+        try:
+            while pending or offset < end:
+                while offset < end and len(pending) < self.prefetch_pages:
+                    window = dict(params, offset=offset, limit=min(page_size, end - offset))
+                    pending.append(pool.submit(self.fetch_page, window))
+                    offset += window["limit"]
+
+                data = pending.popleft().result()
+
+                # If objects were removed since the first page was fetched
+                #   don't ask for windows that no longer exist.
+                end = min(end, data["meta"]["total_count"])
+
+                for item in data["objects"]:
+                    yield item
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    def fetch_page(self, params):
+        """
+        Fetches a single page of the list endpoint and returns the deserialized
+        data.
+        """
+        return self.resource._meta.api.deserialize_response(self.fetch_response(params))
+
+    def fetch_response(self, params):
+        """
+        Fetches a single page of the list endpoint and returns the response.
+        """
+        return self.resource._meta.api.http_resource("GET", self.resource._meta.resource_name, params=params)
+
+    def stream_page(self, params):
+        """
+        Requests a single page of the list endpoint and returns a StreamingPage
+        which decodes the objects while the response is being downloaded.
+        """
+        api = self.resource._meta.api
+        r = api.http_resource("GET", self.resource._meta.resource_name, params=params, stream=True)
+
+        # Only JSON can be decoded incrementally, other formats are decoded
+        #   once the whole page has been downloaded.
+        if api.response_content_type(r) not in (None, "application/json"):
+            return DecodedPage(api.deserialize_response(r))
+
+        return StreamingPage(r.iter_content(chunk_size=STREAM_CHUNK_SIZE), encoding=r.encoding or "utf-8", close=r.close)
 
-    def delete(self):
+    def delete(self, workers=1, callback=None):
         """
-        Deletes the results of this query, it first fetches all the items to be
-        deletes and then issues a PATCH against the list uri of the resource.
+        Deletes the results of this query in chunks of CHUNK_SIZE objects, it
+        fetches the first 'workers' chunks of items to be deleted and then
+        issues a PATCH against the list uri of the resource for each chunk,
+        concurrently if 'workers' is more than 1. Since deleted items no longer
+        match the query this repeats from the first result until nothing is
+        left, so only one round of uris is ever held in memory.
+
+        If given, 'callback' is called with the number of items deleted so far
+        after every chunk. Returns the number of items deleted.
         """
-        uris = [obj["resource_uri"] for obj in self.results()]
-        data = self.resource._meta.api.resource_serialize({"objects": [], "deleted_objects": uris})
-        self.resource._meta.api.http_resource("PATCH", self.resource._meta.resource_name, data=data)
+        deleted = 0
+        previous = set()
+        round_size = CHUNK_SIZE * workers
+
+        pool = thread_pool(workers) if workers > 1 else None
+
+        try:
+            while True:
+                q = self.clone()
+                q.set_limits(high=round_size)
+
+                uris = [obj["resource_uri"] for obj in q.results(limit=CHUNK_SIZE)]
+
+                if not uris:
+                    break
+
+                # If items we asked to be deleted are still being returned the
+                #   query would never run out of results.
+                if previous.intersection(uris):
+                    raise ResponseError("The API did not delete all of the requested objects.")
+
+                chunks = list(chunked(uris, CHUNK_SIZE))
+
+                for num in (pool.map(self.delete_uris, chunks) if pool is not None else map(self.delete_uris, chunks)):
+                    deleted += num
+
+                    if callback is not None:
+                        callback(deleted)
+
+                if len(uris) < round_size:
+                    break
+
+                previous = set(uris)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        return deleted
+
+    def delete_uris(self, uris):
+        """
+        Deletes the given uris with a PATCH against the list uri of the
+        resource, returning how many were deleted.
+        """
+        api = self.resource._meta.api
+
+        data = api.serialize({"objects": [], "deleted_objects": uris})
+        api.http_resource("PATCH", self.resource._meta.resource_name, data=data)
+
+        if api.identity_map is not None:
+            for uri in uris:
+                api.identity_map.discard(uri)
 
         return len(uris)
 
@@ -156,19 +587,53 @@ class Query(object):
 
     def get_count(self):
         """
-        Gets the total_count using the current filter constraints.
+        Gets the total_count using the current filter constraints, reusing the
+        last one seen if it is still fresh.
+        """
+        total_count = self.remembered_count()
+
+        if total_count is None:
+            data = self.fetch_page(self.get_count_params())
+            total_count = data["meta"]["total_count"]
+
+            self.remember_count(total_count)
+
+        return self.clamp_count(total_count)
+
+    def remember_count(self, total_count):
+        self.known_count = (total_count, time.time(), self.resource._meta.writes)
+
+    def remembered_count(self):
+        """
+        Returns the last total_count seen for the current filters, or None if
+        there isn't one or it may be out of date. A count is only reused for
+        Meta.count_ttl seconds, and never after a write to the resource.
+        """
+        if self.known_count is None:
+            return None
+
+        total_count, seen, writes = self.known_count
+
+        if writes != self.resource._meta.writes or time.time() - seen >= self.resource._meta.count_ttl:
+            return None
+
+        return total_count
+
+    def get_count_params(self):
+        """
+        Returns the params of the request used to find the total_count.
         """
         params = self.get_params()
         params["offset"] = self.low_mark
         params["limit"] = 1
 
-        r = self.resource._meta.api.http_resource("GET", self.resource._meta.resource_name, params=params)
-        data = self.resource._meta.api.resource_deserialize(r.text)
-
-        number = data["meta"]["total_count"]
+        return params
 
-        # Apply offset and limit constraints manually, since using limit/offset
-        # in the API doesn't change the total_count output.
+    def clamp_count(self, number):
+        """
+        Applies the offset and limit constraints to a total_count, since using
+        limit/offset in the API doesn't change the total_count output.
+        """
         number = max(0, number - self.low_mark)
         if self.high_mark is not None:
             number = min(number, self.high_mark - self.low_mark)
@@ -226,7 +691,7 @@ class QuerySet(object):
         Allows the QuerySet to be pickled.
         """
         # Force the cache to be fully populated.
-        len(self)
+        self._fetch_all()
 
         obj_dict = self.__dict__.copy()
         obj_dict["_iter"] = None
@@ -242,6 +707,14 @@ class QuerySet(object):
         return repr(data)
 
     def __len__(self):
+        require_sync(self.resource._meta.api, "len() of a QuerySet")
+
+        if self.query.server_len and self._result_cache is None:
+            return self.count()
+
+        return self._fetch_all()
+
+    def _fetch_all(self):
         # Since __len__ is called quite frequently (for example, as part of
         # list(qs), we make some effort here to be as efficient as possible
         # whilst not messing up any existing iterators against the QuerySet.
@@ -267,6 +740,10 @@ class QuerySet(object):
         # iterating over the cache.
         return iter(self._result_cache)
 
+    def __aiter__(self):
+        from .aio import iterator
+        return iterator(self)
+
     def __nonzero__(self):
         if self._result_cache is not None:
             return bool(self._result_cache)
@@ -336,19 +813,68 @@ class QuerySet(object):
         """
         An iterator over the results from applying this QuerySet to the api.
         """
+        api = self.resource._meta.api
+        results = self.query.results()
+
+        if self.query.prefetch_related:
+            results = self._with_related_objects(results)
+
+        if api.hooks:
+            resource_name = self.resource._meta.resource_name
+
+            for item in results:
+                start = default_timer()
+                obj = self._hydrate(item)
+                api.emit("hydrate", resource=resource_name, seconds=default_timer() - start)
 
-        for item in self.query.results():
-            obj = self.resource(**item)
+                yield obj
+            return
+
+        for item in results:
+            obj = self._hydrate(item)
 
             yield obj
 
+    def in_bulk(self, uris):
+        """
+        Returns a dictionary mapping each of the given resource_uris to the
+        object it refers to, using the set endpoint of the resource. Any
+        resource_uris that could not be found are omitted.
+        """
+        api = self.resource._meta.api
+
+        if api.is_async:
+            from .aio import in_bulk
+            return in_bulk(self, uris)
+
+        objs, ids = self._in_bulk_known(uris)
+
+        for chunk in chunked(ids, CHUNK_SIZE):
+            url = "%s/set/%s/" % (self.resource._meta.resource_name, ";".join(chunk))
+            r = api.http_resource("GET", url)
+            data = api.deserialize_response(r)
+
+            for item in data["objects"]:
+                obj = self._hydrate(item)
+                objs[obj.resource_uri] = obj
+
+        return dict([(uri, objs[uri]) for uri in uris if uri in objs])
+
     def count(self):
         """
         Returns the number of records as an integer.
 
         If the QuerySet is already fully cached this simply returns the length
-        of the cached results set to avoid an api call.
+        of the cached results set to avoid an api call. Otherwise the last
+        total_count seen for the same filters is reused for Meta.count_ttl
+        seconds (60 by default) unless the resource has been written to
+        through crust since; set Meta.count_ttl to 0 if the data may change
+        underneath and the count must always be exact.
         """
+        if self.resource._meta.api.is_async:
+            from .aio import count
+            return count(self)
+
         if self._result_cache is not None and not self._iter:
             return len(self._result_cache)
 
@@ -359,25 +885,18 @@ class QuerySet(object):
         Performs the query and returns a single object matching the given
         keyword arguments.
         """
+        if self.resource._meta.api.is_async:
+            from .aio import get
+            return get(self, *args, **kwargs)
+
         clone = self.filter(*args, **kwargs)
 
         if self.query.can_filter():
             clone = clone.order_by()
 
-        num = len(clone)
+        clone._fetch_all()
 
-        if num == 1:
-            return clone._result_cache[0]
-        if not num:
-            raise self.resource.DoesNotExist(
-                "%s matching query does not exist. "
-                "Lookup parameters were %s" %
-                (self.resource._meta.resource_name, kwargs))
-
-        raise self.resource.MultipleObjectsReturned(
-            "get() returned more than one %s -- it returned %s! "
-            "Lookup parameters were %s" %
-            (self.resource._meta.resource_name, num, kwargs))
+        return clone._get_single(clone._result_cache, kwargs)
 
     def create(self, **kwargs):
         """
@@ -385,9 +904,55 @@ class QuerySet(object):
         and returning the created object.
         """
         obj = self.resource(**kwargs)
+
+        if self.resource._meta.api.is_async:
+            from .aio import create
+            return create(obj)
+
         obj.save(force_insert=True)
         return obj
 
+    def bulk_create(self, objs, batch_size=None):
+        """
+        Creates the given objects using one PATCH request against the list uri
+        of the resource for every 'batch_size' objects, instead of a POST per
+        object. If the API returns the created objects, the instances are
+        updated with them (including their resource_uri).
+        """
+        require_sync(self.resource._meta.api, "QuerySet.bulk_create()")
+
+        # The objects are used more than once, so can't be a generator.
+        objs = list(objs)
+
+        for obj in objs:
+            if obj.resource_uri is not None:
+                raise ValueError("Cannot bulk create %s objects that already have a resource_uri." % self.resource._meta.resource_name)
+
+        self._bulk_patch(objs, [obj._dehydrate() for obj in objs], batch_size)
+
+        return objs
+
+    def bulk_update(self, objs, fields=None, batch_size=None):
+        """
+        Updates the given objects using one PATCH request against the list uri
+        of the resource for every 'batch_size' objects, instead of a PUT per
+        object. If 'fields' is given only those fields are sent.
+        """
+        require_sync(self.resource._meta.api, "QuerySet.bulk_update()")
+
+        objs = list(objs)
+        payloads = []
+
+        for obj in objs:
+            if obj.resource_uri is None:
+                raise ValueError("Cannot bulk update %s objects without a resource_uri." % self.resource._meta.resource_name)
+
+            data = obj._dehydrate(fields)
+            data["resource_uri"] = obj.resource_uri
+            payloads.append(data)
+
+        self._bulk_patch(objs, payloads, batch_size)
+
     def get_or_create(self, **kwargs):
         """
         Looks up an object with the given kwargs, creating one if necessary.
@@ -396,6 +961,10 @@ class QuerySet(object):
         """
         assert kwargs, "get_or_create() must be passed at least one keyword argument"
 
+        if self.resource._meta.api.is_async:
+            from .aio import get_or_create
+            return get_or_create(self, **kwargs)
+
         defaults = kwargs.pop("defaults", {})
         lookup = kwargs.copy()
 
@@ -408,20 +977,24 @@ class QuerySet(object):
             obj = self.create(**params)
             return obj, True
 
-    def delete(self):
+    def delete(self, workers=1, callback=None):
         """
-        Deletes the records in the current QuerySet.
+        Deletes the records in the current QuerySet, see Query.delete for the
+        meaning of 'workers' and 'callback'.
         """
         assert self.query.can_filter(), "Cannot use 'limit' or 'offset' with delete."
+        require_sync(self.resource._meta.api, "QuerySet.delete()")
 
         del_query = self._clone()
 
         # Disable non-supported fields.
         del_query.query.clear_ordering()
 
-        return del_query.query.delete()
+        return del_query.query.delete(workers=workers, callback=callback)
 
     def exists(self):
+        require_sync(self.resource._meta.api, "QuerySet.exists()")
+
         if self._result_cache is None:
             return self.query.has_results()
         return bool(self._result_cache)
@@ -430,6 +1003,63 @@ class QuerySet(object):
     # PUBLIC METHODS THAT ALTER ATTRIBUTES AND RETURN A NEW QUERYSET #
     ##################################################################
 
+    def values(self, *fields, **kwargs):
+        """
+        Returns a new QuerySet instance that yields dictionaries of the raw
+        data of the given fields (or all of the data if there are none) instead
+        of resource instances. If 'hydrate' is True the values of the fields of
+        the resource are hydrated.
+        """
+        hydrate = kwargs.pop("hydrate", False)
+
+        if kwargs:
+            raise TypeError("Unexpected keyword arguments to values: %s" % (list(kwargs),))
+
+        return self._clone(klass=ValuesQuerySet, setup=True, _fields=fields, _hydrate_fields=hydrate)
+
+    def values_list(self, *fields, **kwargs):
+        """
+        Returns a new QuerySet instance that yields tuples of the raw data of
+        the given fields (or the resource_uri and all fields of the resource if
+        there are none) instead of resource instances. If 'flat' is True and a
+        single field is given the values themselves are yielded, and if
+        'hydrate' is True they are hydrated.
+        """
+        flat = kwargs.pop("flat", False)
+        hydrate = kwargs.pop("hydrate", False)
+
+        if kwargs:
+            raise TypeError("Unexpected keyword arguments to values_list: %s" % (list(kwargs),))
+
+        if flat and len(fields) > 1:
+            raise TypeError("'flat' is not valid when values_list is called with more than one field.")
+
+        if not fields:
+            fields = ("resource_uri",) + tuple(self.resource._meta.fields.keys())
+
+        return self._clone(klass=ValuesListQuerySet, setup=True, _fields=fields, _hydrate_fields=hydrate, flat=flat)
+
+    def export(self, fileobj, format="ndjson", fields=None, gzip=False, progress=None):
+        """
+        Writes the results to 'fileobj' as "ndjson" or "csv" and returns the
+        number of objects written. The raw data is written straight from the
+        API's pages without creating resource instances or filling the result
+        cache, so memory use doesn't grow with the number of results.
+
+        Only the given 'fields' are written; for csv they default to the
+        resource_uri and the fields of the resource. If 'gzip' is True the
+        output is compressed, and 'progress' is called with the number of
+        objects written so far as the export goes.
+        """
+        from .export import export
+
+        require_sync(self.resource._meta.api, "QuerySet.export()")
+
+        if fields is None and format == "csv":
+            fields = ("resource_uri",) + tuple(self.resource._meta.fields.keys())
+
+        return export(self.query.results(), fileobj, format=format, fields=fields, gzip=gzip, progress=progress)
+
     def all(self):
         """
         Returns a new QuerySet that is a copy of the current one.
@@ -449,6 +1079,88 @@ class QuerySet(object):
 
         return clone
 
+    def prefetch(self, pages=4):
+        """
+        Returns a new QuerySet instance that fetches up to 'pages' pages ahead
+        of the one currently being iterated over, using a pool of 'pages'
+        worker threads.
+        """
+        clone = self._clone()
+        clone.query.prefetch_pages = pages
+
+        return clone
+
+    def keyset(self):
+        """
+        Returns a new QuerySet instance which pages through the results by the
+        value of its (unique) ordering field rather than by offset, e.g.
+        qs.order_by("id").keyset() requests id__gt=<last id> for each page.
+        """
+        assert self.query.order_by, "Cannot use keyset pagination on an unordered query."
+
+        clone = self._clone()
+        clone.query.keyset = True
+
+        return clone
+
+    def server_len(self):
+        """
+        Returns a new QuerySet instance whose len() is the count reported by
+        the API, rather than the number of objects after fetching them all.
+        """
+        clone = self._clone()
+        clone.query.server_len = True
+
+        return clone
+
+    def page_size(self, limit):
+        """
+        Returns a new QuerySet instance that requests 'limit' objects per page,
+        or as many as the API allows if 'limit' is 0.
+        """
+        clone = self._clone()
+        clone.query.page_size = limit
+
+        return clone
+
+    def adaptive(self, **kwargs):
+        """
+        Returns a new QuerySet instance that adjusts the number of objects it
+        requests per page to the observed latency and size of the pages. The
+        keyword arguments are passed to AdaptiveLimit.
+        """
+        clone = self._clone()
+        clone.query.adaptive = AdaptiveLimit(**kwargs)
+
+        return clone
+
+    def stream(self):
+        """
+        Returns a new QuerySet instance that decodes every page incrementally
+        while it is being downloaded, yielding each object as soon as it is
+        complete instead of holding whole pages in memory.
+        """
+        clone = self._clone()
+        clone.query.streaming = True
+
+        return clone
+
+    def prefetch_related(self, *fields):
+        """
+        Returns a new QuerySet instance that fetches the objects of the given
+        related fields in bulk, one request per related resource for every
+        chunk of results, instead of one request per object.
+        """
+        for name in fields:
+            field = self.resource._meta.fields.get(name)
+            if not isinstance(field, RelatedField):
+                raise ValueError("'%s' is not a related field of %s" % (name, self.resource.__name__))
+
+        clone = self._clone()
+        clone.query.prefetch_related = clone.query.prefetch_related + tuple(fields)
+
+        return clone
+
     def order_by(self, field_name=None):
         """
         Returns a new QuerySet instance with the ordering changed.
@@ -493,11 +1205,143 @@ class QuerySet(object):
                 pos += 1
 
             if not self._iter:
-                raise StopIteration
+                return
 
             if len(self._result_cache) <= pos:
                 self._fill_cache()
 
+    def _in_bulk_known(self, uris):
+        """
+        Returns a dict of the objects for 'uris' held by the api's identity map,
+        and a list of the ids of the others, which in_bulk() has to fetch.
+        """
+        identity_map = self.resource._meta.api.identity_map
+        objs = {}
+        ids = []
+
+        for uri in uris:
+            if identity_map is not None:
+                obj = identity_map.get(uri)
+                if obj is not None:
+                    objs[uri] = obj
+                    continue
+
+            ident = uri.rstrip("/").rsplit("/", 1)[-1]
+            if ident not in ids:
+                ids.append(ident)
+
+        return objs, ids
+
+    def _with_related_objects(self, results):
+        """
+        Yields the 'results', with the objects of the related fields named in
+        query.prefetch_related fetched for every ITER_CHUNK_SIZE of them.
+        """
+        for items in chunked(results, ITER_CHUNK_SIZE):
+            for item in self._prefetch_related_objects(items):
+                yield item
+
+    def _prefetch_related_objects(self, items):
+        """
+        Returns copies of 'items' where the uris of the related fields named in
+        query.prefetch_related are replaced by their objects, which are fetched
+        with one set request per related resource.
+        """
+        items = [item.copy() for item in items]
+
+        for name in self.query.prefetch_related:
+            field = self.resource._meta.fields[name]
+            uris = self._related_uris(items, field)
+
+            if uris:
+                self._replace_related(items, field, field.resource_class.objects.in_bulk(uris))
+
+        return items
+
+    def _related_uris(self, items, field):
+        """
+        Returns the uris of the objects of 'field' referred to by 'items'.
+        """
+        many = isinstance(field, ToManyField)
+        uris = []
+
+        for item in items:
+            value = item.get(field.name)
+            if value is None:
+                continue
+            uris.extend(value if many else [value])
+
+        return uris
+
+    def _replace_related(self, items, field, objs):
+        """
+        Replaces the uris of 'field' in 'items' by their objects from 'objs'.
+        """
+        many = isinstance(field, ToManyField)
+
+        for item in items:
+            value = item.get(field.name)
+            if value is None:
+                continue
+            if many:
+                item[field.name] = [objs.get(uri, uri) for uri in value]
+            else:
+                item[field.name] = objs.get(value, value)
+
+    def _bulk_patch(self, objs, payloads, batch_size=None):
+        """
+        Sends 'payloads' as the objects of PATCH requests against the list uri,
+        'batch_size' at a time, updating 'objs' from the objects the API returns.
+        """
+        api = self.resource._meta.api
+
+        for batch in chunked(list(zip(objs, payloads)), batch_size or CHUNK_SIZE):
+            data = api.serialize({"objects": [payload for obj, payload in batch]})
+            r = api.http_resource("PATCH", self.resource._meta.resource_name, data=data)
+
+            # Unless always_return_data is set Tastypie responds with an empty
+            #   202 Accepted, in which case there is nothing to update.
+            if not r.content:
+                continue
+
+            returned = api.deserialize_response(r).get("objects") or []
+
+            for (obj, payload), item in zip(batch, returned):
+                obj.__init__(**item)
+                obj._update_identity_map()
+
+    def _hydrate(self, item):
+        """
+        Returns the object for a single item of results, consulting the api's
+        identity map if there is one.
+        """
+        identity_map = self.resource._meta.api.identity_map
+
+        if identity_map is not None:
+            return identity_map.hydrate(self.resource, item)
+
+        return self.resource(**item)
+
+    def _get_single(self, results, lookup):
+        """
+        Returns the only object in 'results', raising DoesNotExist or
+        MultipleObjectsReturned otherwise.
+        """
+        num = len(results)
+
+        if num == 1:
+            return results[0]
+        if not num:
+            raise self.resource.DoesNotExist(
+                "%s matching query does not exist. "
+                "Lookup parameters were %s" %
+                (self.resource._meta.resource_name, lookup))
+
+        raise self.resource.MultipleObjectsReturned(
+            "get() returned more than one %s -- it returned %s! "
+            "Lookup parameters were %s" %
+            (self.resource._meta.resource_name, num, lookup))
+
     def _fill_cache(self, num=None):
         """
         Fills the result cache with 'num' more entries (or until the results
@@ -520,3 +1364,68 @@ class QuerySet(object):
         c.__dict__.update(kwargs)
 
         return c
+
+
+class ValuesQuerySet(QuerySet):
+    """
+    A QuerySet which yields dictionaries of raw data instead of resource
+    instances, skipping the cost of constructing them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(ValuesQuerySet, self).__init__(*args, **kwargs)
+
+        self._fields = ()
+        self._hydrate_fields = False
+
+    def _hydrate(self, item):
+        if self._fields:
+            row = dict([(name, item.get(name)) for name in self._fields])
+        else:
+            row = item.copy()
+
+        if self._hydrate_fields:
+            for name, field in self.resource._meta.fields.items():
+                if name in row:
+                    row[name] = field.hydrate(row[name])
+
+        return row
+
+    def _clone(self, klass=None, setup=False, **kwargs):
+        c = super(ValuesQuerySet, self)._clone(klass, setup, **kwargs)
+
+        if not setup:
+            c._fields = self._fields
+            c._hydrate_fields = self._hydrate_fields
+
+        return c
+
+
+class ValuesListQuerySet(ValuesQuerySet):
+    """
+    A QuerySet which yields tuples (or single values, if flat) of raw data
+    instead of resource instances.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(ValuesListQuerySet, self).__init__(*args, **kwargs)
+
+        self.flat = False
+
+    def _hydrate(self, item):
+        fields = self.resource._meta.fields
+
+        if self._hydrate_fields:
+            values = tuple(fields[name].hydrate(item.get(name)) if name in fields else item.get(name) for name in self._fields)
+        else:
+            values = tuple(item.get(name) for name in self._fields)
+
+        return values[0] if self.flat else values
+
+    def _clone(self, klass=None, setup=False, **kwargs):
+        c = super(ValuesListQuerySet, self)._clone(klass, setup, **kwargs)
+
+        if not setup:
+            c.flat = self.flat
+
+        return c
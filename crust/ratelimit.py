@@ -0,0 +1,172 @@
+import threading
+import time
+
+from .retry import RetryPolicy
+
+
+class TokenBucket(object):
+    """
+    A thread safe token bucket which refills at 'rate' tokens per second and
+    holds at most 'capacity' tokens, allowing bursts of that many requests.
+
+    reserve() never blocks, it takes a token (possibly going into debt) and
+    returns how long the caller must wait before using it, so the same bucket
+    can be shared by threads, which time.sleep(), and coroutines, which
+    asyncio.sleep().
+    """
+
+    def __init__(self, rate, capacity=None, *args, **kwargs):
+        super(TokenBucket, self).__init__(*args, **kwargs)
+
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1, rate))
+
+        self._tokens = self.capacity
+        self._updated = time.time()
+        self._blocked_until = 0
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self):
+        with self._lock:
+            self._refill(time.time())
+            return self._tokens
+
+    def _refill(self, now):
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def reserve(self, tokens=1):
+        """
+        Takes 'tokens' from the bucket and returns the number of seconds to
+        wait before they may be used.
+        """
+        with self._lock:
+            now = time.time()
+            self._refill(now)
+            self._tokens -= tokens
+
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+            return max(wait, self._blocked_until - now)
+
+    def acquire(self, tokens=1):
+        """
+        Takes 'tokens' from the bucket, sleeping until they may be used.
+        """
+        wait = self.reserve(tokens)
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def block(self, seconds):
+        """
+        Makes every reservation wait at least until 'seconds' from now.
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.time() + seconds)
+
+    def limit(self, remaining):
+        """
+        Caps the tokens available at 'remaining', as reported by the server.
+        """
+        with self._lock:
+            self._refill(time.time())
+            self._tokens = min(self._tokens, remaining)
+
+    def throttled(self, decrease=0.5, min_rate=0.1):
+        """
+        Slows the refill rate down after the server throttled a request.
+        """
+        with self._lock:
+            self._refill(time.time())
+            self.rate = max(min_rate, self.rate * decrease)
+
+    def succeeded(self, increase=0.05):
+        """
+        Speeds the refill rate back up towards its maximum after a request
+        which wasn't throttled.
+        """
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(time.time())
+                self.rate = min(self.max_rate, self.rate + self.max_rate * increase)
+
+
+class RateLimiter(object):
+    """
+    Limits the rate of requests made by an Api to 'rate' per second, with
+    bursts of up to 'capacity' requests.
+
+    If 'per_resource' is True each resource gets its own bucket, otherwise
+    they all share one. Unless 'adaptive' is False the limiter follows the
+    X-RateLimit-Remaining and X-RateLimit-Reset headers of responses, and
+    backs off (recovering gradually) when a request is throttled with a 429.
+    """
+
+    def __init__(self, rate, capacity=None, per_resource=False, adaptive=True, *args, **kwargs):
+        super(RateLimiter, self).__init__(*args, **kwargs)
+
+        self.rate = rate
+        self.capacity = capacity
+        self.per_resource = per_resource
+        self.adaptive = adaptive
+
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, resource=None):
+        """
+        Returns the TokenBucket used for requests to 'resource'.
+        """
+        key = resource if self.per_resource else None
+
+        with self._lock:
+            try:
+                return self._buckets[key]
+            except KeyError:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity)
+                return bucket
+
+    def reserve(self, resource=None):
+        """
+        Takes a token for a request to 'resource' and returns the number of
+        seconds to wait before making it.
+        """
+        return self.bucket(resource).reserve()
+
+    def observe(self, resource, response):
+        """
+        Adapts the bucket for 'resource' to a response from the server.
+        """
+        if not self.adaptive:
+            return
+
+        bucket = self.bucket(resource)
+
+        if response.status_code == 429:
+            bucket.throttled()
+            bucket.block(RetryPolicy.retry_after(response) or 1 / bucket.rate)
+            return
+
+        bucket.succeeded()
+
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+
+        try:
+            remaining = int(remaining) if remaining is not None else None
+            reset = float(reset) if reset is not None else None
+        except ValueError:
+            return
+
+        if remaining is None:
+            return
+
+        bucket.limit(remaining)
+
+        if remaining <= 0 and reset is not None:
+            # The reset is either a unix timestamp or a number of seconds.
+            bucket.block(reset - time.time() if reset > 1e9 else reset)
@@ -2,3 +2,4 @@
 # Simply delete crust/requests.py and replace it with the requests directory from
 #     the requests package.
 from requests import *
+from requests import adapters
@@ -1,3 +1,6 @@
+import keyword
+import re
+
 from collections import OrderedDict
 
 from . import six
@@ -7,12 +10,30 @@ from .query import QuerySet
 from .utils import subclass_exception
 
 
+IDENTIFIER_REGEX = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# The types of the values a response is deserialized to.
+WIRE_TYPES = six.string_types + six.integer_types + (float, type(None))
+
+
 class Options(object):
 
     def __init__(self, meta):
         self.api = None
         self.meta = meta
         self.resource_name = getattr(meta, "resource_name", None)
+        self.compact = getattr(meta, "compact", False)
+        self.lazy_hydration = getattr(meta, "lazy_hydration", False)
+        self.lazy_fields = frozenset()
+
+        # The largest page the API returns, learned when it clamps a limit.
+        self.max_limit = getattr(meta, "max_limit", None)
+
+        # The number of seconds a total_count is reused for by count(), 0 to
+        #   always ask the API, and the number of writes made to the resource
+        #   through crust, which invalidate it.
+        self.count_ttl = getattr(meta, "count_ttl", 60)
+        self.writes = 0
         self.fields = OrderedDict()
 
     def contribute_to_class(self, cls, name):
@@ -51,11 +72,19 @@ class ResourceBase(type):
             # If this isn't a subclass of Resource, don't do anything special.
             return super_new(cls, name, bases, attrs)
 
+        attr_meta = attrs.pop("Meta", None)
+
         # Create the class
         module = attrs.pop("__module__")
-        new_class = super_new(cls, name, bases, {"__module__": module})
+        class_attrs = {"__module__": module}
 
-        attr_meta = attrs.pop("Meta", None)
+        if getattr(attr_meta, "compact", False):
+            if getattr(attr_meta, "lazy_hydration", False):
+                raise TypeError("%s cannot use both Meta.compact and Meta.lazy_hydration, since fields stored in slots cannot be hydrated lazily." % name)
+
+            class_attrs["__slots__"] = cls.compact_slots(parents, attr_meta, attrs)
+
+        new_class = super_new(cls, name, bases, class_attrs)
 
         if not attr_meta:
             meta = getattr(new_class, "Meta", None)
@@ -96,8 +125,85 @@ class ResourceBase(type):
         if not hasattr(new_class, "objects"):
             new_class.objects = QuerySet(new_class)
 
+        if new_class._meta.lazy_hydration:
+            # Fields which need hydrating get a descriptor which hydrates them
+            #   on first access, the rest are simply stored.
+            lazy_fields = []
+
+            for name, field in new_class._meta.fields.items():
+                if _hydrates(field):
+                    setattr(new_class, name, LazyHydration(field))
+                    lazy_fields.append(name)
+
+            new_class._meta.lazy_fields = frozenset(lazy_fields)
+
+        if new_class._meta.compact:
+            if "__init__" not in attrs:
+                new_class.__init__ = cls.compact_init(new_class)
+
+            new_class.__getstate__ = _compact_getstate
+            new_class.__setstate__ = _compact_setstate
+
         return new_class
 
+    @staticmethod
+    def compact_slots(parents, meta, attrs):
+        """
+        Returns the __slots__ of a compact resource, one for each of its fields
+        which isn't already provided by its parents.
+
+        Resource itself provides a __dict__, but since every field is stored in
+        a slot the __dict__ of a compact instance is never created.
+
+        On CPython 3.11 and later, where instance dicts are already created
+        lazily and share their keys, this saves only about 5% of the memory of
+        a resource; the gain is larger on older versions.
+        """
+        names = ["resource_uri"]
+        names.extend(getattr(meta, "fields", []))
+        names.extend(k for k, v in attrs.items() if isinstance(v, Field))
+
+        existing = set()
+        for parent in parents:
+            for klass in parent.__mro__:
+                existing.update(klass.__dict__.get("__slots__", ()))
+
+        slots = []
+        for slot in names:
+            if slot not in existing and slot not in slots:
+                slots.append(slot)
+
+        return tuple(slots)
+
+    @staticmethod
+    def compact_init(new_class):
+        """
+        Generates an __init__ for a compact resource which hydrates each field
+        with straight line code, rather than looping over the fields.
+        """
+        names = list(new_class._meta.fields.keys())
+
+        if not all(IDENTIFIER_REGEX.match(n) and not keyword.iskeyword(n) for n in names):
+            return Resource.__init__
+
+        namespace = {}
+        lines = [
+            "def __init__(self, resource_uri=None, *args, **kwargs):",
+            "    self.resource_uri = resource_uri",
+            "    get = kwargs.get",
+        ]
+
+        for i, (name, field) in enumerate(new_class._meta.fields.items()):
+            if not _hydrates(field):
+                lines.append("    self.%s = get(%r)" % (name, name))
+            else:
+                namespace["hydrate_%d" % i] = field.hydrate
+                lines.append("    self.%s = hydrate_%d(get(%r))" % (name, i, name))
+
+        six.exec_("\n".join(lines), namespace)
+
+        return namespace["__init__"]
+
     def add_to_class(cls, name, value):
         if hasattr(value, "contribute_to_class"):
             value.contribute_to_class(cls, name)
@@ -105,11 +211,100 @@ class ResourceBase(type):
             setattr(cls, name, value)
 
 
+def _hydrates(field):
+    """
+    Returns True if the hydrate of 'field' does anything.
+    """
+    return six.get_unbound_function(type(field).hydrate) is not six.get_unbound_function(Field.hydrate)
+
+
+def _is_wire_data(value):
+    """
+    Returns True if 'value' is made up only of the types a response is
+    deserialized to, rather than holding objects such as resources.
+    """
+    if isinstance(value, (list, tuple)):
+        return all(_is_wire_data(v) for v in value)
+    if isinstance(value, dict):
+        return all(_is_wire_data(v) for v in value.values())
+
+    return isinstance(value, WIRE_TYPES)
+
+
+_missing = object()
+
+
+class LazyHydration(object):
+    """
+    A descriptor which hydrates the raw value of a field on first access.
+
+    The hydrated value is stored in the instance's __dict__, which takes
+    precedence over this (non data) descriptor, so later accesses are plain
+    attribute lookups.
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        name = self.field.name
+        raw = instance._raw_data.get(name, _missing)
+
+        if raw is _missing:
+            # Another thread hydrated the value meanwhile.
+            return instance.__dict__.get(name)
+
+        value = self.field.hydrate(raw)
+
+        # The value is stored before the raw one is discarded, so that it is
+        #   always in one or the other for concurrent readers.
+        instance.__dict__[name] = value
+        instance._raw_data.pop(name, None)
+
+        return value
+
+
+def _compact_getstate(self):
+    # Only the slots are read, since even reading self.__dict__ would create
+    #   one on the instance.
+    state = {}
+
+    for name in ["resource_uri"] + list(self._meta.fields.keys()):
+        if hasattr(self, name):
+            state[name] = getattr(self, name)
+
+    return state
+
+
+def _compact_setstate(self, state):
+    for name, value in state.items():
+        setattr(self, name, value)
+
+
 class Resource(six.with_metaclass(ResourceBase, object)):
 
     def __init__(self, resource_uri=None, *args, **kwargs):
         self.resource_uri = resource_uri
 
+        if self._meta.lazy_hydration:
+            self._raw_data = {}
+
+            for name, field in self._meta.fields.items():
+                val = kwargs.pop(name, None)
+
+                if name in self._meta.lazy_fields:
+                    # Forget any previously hydrated value, so the descriptor
+                    #   hydrates the new raw one.
+                    self.__dict__.pop(name, None)
+                    self._raw_data[name] = val
+                else:
+                    setattr(self, name, val)
+
+            return
+
         for name, field in self._meta.fields.items():
             val = kwargs.pop(name, None)
             setattr(self, name, field.hydrate(val))
@@ -135,33 +330,26 @@ class Resource(six.with_metaclass(ResourceBase, object)):
         that the "save" must be a POST or PUT respectively. Normally, they
         should not be set.
         """
-        if force_insert and force_update:
-            raise ValueError("Cannot force both insert and updating in resource saving.")
-
-        data = {}
+        if self._meta.api.is_async:
+            from .aio import save
+            return save(self, force_insert=force_insert, force_update=force_update)
 
-        for name, field in self._meta.fields.items():
-            if field.serialize:
-                data[name] = field.dehydrate(getattr(self, name, None))
+        method, url, data = self._get_save_request(force_insert, force_update)
 
-        insert = True if force_insert or self.resource_uri is None else False
+        resp = self._meta.api.http_resource(method, url, data=self._meta.api.serialize(data))
 
-        if insert:
-            resp = self._meta.api.http_resource("POST", self._meta.resource_name, data=self._meta.api.resource_serialize(data))
-        else:
-            resp = self._meta.api.http_resource("PUT", self.resource_uri, data=self._meta.api.resource_serialize(data))
+        url = self._get_refresh_url(resp)
 
-        if "Location" in resp.headers:
-            resp = self._meta.api.http_resource("GET", resp.headers["Location"])
-        elif resp.status_code == 204:
-            resp = self._meta.api.http_resource("GET", self.resource_uri)
-        else:
+        if url is None:
+            self._update_identity_map()
             return
 
-        data = self._meta.api.resource_deserialize(resp.text)
+        resp = self._meta.api.http_resource("GET", url)
+        data = self._meta.api.deserialize_response(resp)
 
         # Update local values from the API Response
         self.__init__(**data)
+        self._update_identity_map()
 
     def delete(self):
         """
@@ -171,7 +359,78 @@ class Resource(six.with_metaclass(ResourceBase, object)):
         if self.resource_uri is None:
             raise ValueError("{0} object cannot be deleted because resource_uri attribute cannot be None".format(self._meta.resource_name))
 
+        if self._meta.api.is_async:
+            from .aio import delete
+            return delete(self)
+
         self._meta.api.http_resource("DELETE", self.resource_uri)
+        self._update_identity_map(deleted=True)
+
+    def _get_save_request(self, force_insert=False, force_update=False):
+        """
+        Returns the method, url and data of the request that saves the current
+        instance.
+        """
+        if force_insert and force_update:
+            raise ValueError("Cannot force both insert and updating in resource saving.")
+
+        data = self._dehydrate()
+
+        insert = True if force_insert or self.resource_uri is None else False
+
+        if insert:
+            return "POST", self._meta.resource_name, data
+        else:
+            return "PUT", self.resource_uri, data
+
+    def _update_identity_map(self, deleted=False):
+        """
+        Keeps the api's identity map, if any, coherent after this instance has
+        been saved or deleted.
+        """
+        identity_map = self._meta.api.identity_map
+
+        if identity_map is None or self.resource_uri is None:
+            return
+
+        if deleted:
+            identity_map.discard(self.resource_uri)
+        else:
+            identity_map.add(self)
+
+    def _dehydrate(self, fields=None):
+        """
+        Returns the serializable data of the current instance, restricted to
+        the given field names if any.
+        """
+        data = {}
+        raw = self.__dict__.get("_raw_data", {}) if self._meta.lazy_hydration else {}
+
+        for name, field in self._meta.fields.items():
+            if fields is not None and name not in fields:
+                continue
+            if field.serialize:
+                value = raw.get(name, _missing)
+
+                # A value which was never hydrated is sent back unchanged, as
+                #   long as it is still what the API returned (prefetched
+                #   related objects are not).
+                if value is not _missing and name not in self.__dict__ and _is_wire_data(value):
+                    data[name] = value
+                else:
+                    data[name] = field.dehydrate(getattr(self, name, None))
+
+        return data
+
+    def _get_refresh_url(self, resp):
+        """
+        Returns the url to fetch the saved state of the current instance from,
+        or None if the save response doesn't point to it.
+        """
+        if "Location" in resp.headers:
+            return resp.headers["Location"]
+        elif resp.status_code == 204:
+            return self.resource_uri
 
 
 class LazyResource(object):
@@ -183,14 +442,66 @@ class LazyResource(object):
         return "<LazyResource {object_name}({url})>".format(object_name=self._lazy_state["cls"].__class__.__name__, url=self._lazy_state["url"])
 
     def __getattr__(self, name):
+        return getattr(self._lazy_load(), name)
+
+    def __setattr__(self, name, value):
+        if name == "_lazy_state":
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._lazy_load(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._lazy_load(), name)
+
+    def _lazy_load(self):
+        """
+        Fetches the object unless that has been done already, and returns the
+        object which attribute access is forwarded to.
+        """
+        if "obj" in self._lazy_state:
+            return self._lazy_state["obj"]
+
+        cls = self._lazy_state["cls"]
+        identity_map = cls._meta.api.identity_map
+
+        obj = identity_map.get(self._lazy_state["url"]) if identity_map is not None else None
+
+        if obj is None:
+            if cls._meta.api.is_async:
+                raise TypeError("The related {0} must be loaded with 'await crust.aio.resolve(obj)' before using it, since {1} is asynchronous.".format(cls.__name__, cls._meta.api.__class__.__name__))
+
+            r = cls._meta.api.http_resource("GET", self._lazy_state["url"])
+            data = cls._meta.api.deserialize_response(r)
+
+            obj = cls(**data)
+
+        return self._lazy_become(obj)
+
+    def _lazy_become(self, obj):
+        """
+        Makes this LazyResource stand for 'obj' from now on, and returns the
+        object which attribute access is forwarded to.
+        """
         cls = self._lazy_state["cls"]
+        identity_map = cls._meta.api.identity_map
+
+        if cls._meta.compact:
+            # Compact resources have no __dict__ to take over, so act as a
+            #   proxy to the object instead.
+            self._lazy_state["obj"] = obj
+
+            if identity_map is not None and identity_map.get(obj.resource_uri) is None:
+                identity_map.add(obj)
 
-        r = cls._meta.api.http_resource("GET", self._lazy_state["url"])
-        data = cls._meta.api.resource_deserialize(r.text)
+            return obj
 
-        obj = cls(**data)
+        # Bypasses our __setattr__, which would otherwise load the object.
+        object.__setattr__(self, "__class__", obj.__class__)
+        object.__setattr__(self, "__dict__", obj.__dict__)
 
-        self.__class__ = obj.__class__
-        self.__dict__ = obj.__dict__
+        if identity_map is not None and identity_map.get(self.resource_uri) is None:
+            # Register ourself rather than obj, since obj isn't referenced by
+            #   anything once we've taken over its state.
+            identity_map.add(self)
 
-        return getattr(obj, name)
+        return self
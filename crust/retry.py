@@ -0,0 +1,162 @@
+import calendar
+import email.utils
+import random
+import threading
+import time
+
+from . import requests
+from .exceptions import CircuitOpenError
+
+
+# Methods which have the same effect when repeated, so are safe to retry even
+#   if the server may have processed the failed request.
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"])
+
+# Statuses which mean the request wasn't processed and may succeed later.
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+
+
+class RetryPolicy(object):
+    """
+    Decides whether a failed request is retried and how long to wait first.
+
+    Requests are retried up to 'total' times, waiting an exponentially growing
+    'backoff_factor' * 2 ** attempt seconds, with full jitter, capped at
+    'max_backoff'. A Retry-After header sent with the response is honoured
+    instead, if 'respect_retry_after' is True.
+
+    Only requests using one of 'methods' are retried after a connection error
+    or a 502/504, since a non idempotent request may already have been
+    processed. A 429, a 503 and a connection which was never established mean
+    that it wasn't, so those are retried for any method.
+    """
+
+    def __init__(self, total=3, backoff_factor=0.5, max_backoff=60, statuses=RETRY_STATUSES, methods=IDEMPOTENT_METHODS, respect_retry_after=True, *args, **kwargs):
+        super(RetryPolicy, self).__init__(*args, **kwargs)
+
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(m.upper() for m in methods)
+        self.respect_retry_after = respect_retry_after
+
+    def should_retry(self, method, attempt, response=None, exception=None):
+        """
+        Returns True if a request which failed on its 'attempt'th try (counting
+        from 0), with either 'response' or 'exception', should be retried.
+        """
+        if attempt >= self.total:
+            return False
+
+        idempotent = method.upper() in self.methods
+
+        if exception is not None:
+            return idempotent or isinstance(exception, requests.ConnectTimeout)
+
+        if response is None or response.status_code not in self.statuses:
+            return False
+
+        return idempotent or response.status_code in (429, 503)
+
+    def backoff(self, attempt, response=None):
+        """
+        Returns the number of seconds to wait before retrying after the
+        'attempt'th try.
+        """
+        if response is not None and self.respect_retry_after:
+            retry_after = self.retry_after(response)
+
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    @staticmethod
+    def retry_after(response):
+        """
+        Returns the number of seconds from the Retry-After header of a
+        response, which is either a number of seconds or an HTTP date.
+        """
+        value = response.headers.get("Retry-After")
+
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        parsed = email.utils.parsedate_tz(value)
+
+        if parsed is None:
+            return None
+
+        return max(0.0, calendar.timegm(parsed[:9]) - (parsed[9] or 0) - time.time())
+
+
+class CircuitBreaker(object):
+    """
+    Tracks failures per host and fails fast, raising CircuitOpenError, once a
+    host has failed 'failure_threshold' times in a row.
+
+    After 'reset_timeout' seconds a single trial request is let through; if it
+    succeeds the circuit closes again, otherwise it stays open for another
+    'reset_timeout' seconds.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, *args, **kwargs):
+        super(CircuitBreaker, self).__init__(*args, **kwargs)
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        # host -> [state, consecutive failures, opened at]
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def state(self, host):
+        with self._lock:
+            return self._circuits.get(host, [self.CLOSED])[0]
+
+    def before(self, host):
+        """
+        Called before making a request to 'host', raises CircuitOpenError if
+        it should not be made.
+        """
+        with self._lock:
+            circuit = self._circuits.get(host)
+
+            if circuit is None or circuit[0] == self.CLOSED:
+                return
+
+            if circuit[0] == self.OPEN and time.time() - circuit[2] >= self.reset_timeout:
+                circuit[0] = self.HALF_OPEN
+                return
+
+        raise CircuitOpenError("The circuit for {0} is open after repeated failures.".format(host))
+
+    def success(self, host):
+        with self._lock:
+            self._circuits.pop(host, None)
+
+    def failure(self, host):
+        with self._lock:
+            circuit = self._circuits.setdefault(host, [self.CLOSED, 0, None])
+            circuit[1] += 1
+
+            if circuit[0] == self.HALF_OPEN or circuit[1] >= self.failure_threshold:
+                circuit[0] = self.OPEN
+                circuit[2] = time.time()
+
+    @staticmethod
+    def is_failure(response):
+        """
+        Returns True if 'response' means the host is unhealthy.
+        """
+        return response.status_code >= 500
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from . import six
+from .fields import Field, DateTimeField, DateField, TimeField, ToOneField, ToManyField
+from .resources import Resource
+from .utils import thread_pool
+
+if six.PY3:
+    import urllib.parse as urllib_parse
+else:
+    import urlparse as urllib_parse
+
+
+# The number of schemas fetched at once when the API doesn't return them all
+#   with the top level index.
+SCHEMA_WORKERS = 8
+
+FIELD_TYPES = {
+    "datetime": DateTimeField,
+    "date": DateField,
+    "time": TimeField,
+}
+
+
+class SchemaCache(object):
+    """
+    Persists the schemas of an API as JSON files in 'cache_dir', which are
+    considered fresh for 'ttl' seconds after they were downloaded.
+    """
+
+    def __init__(self, cache_dir, ttl=24 * 60 * 60, *args, **kwargs):
+        super(SchemaCache, self).__init__(*args, **kwargs)
+
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+
+    def path(self, url):
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, "schema-%s.json" % digest)
+
+    def load(self, url, stale=False):
+        """
+        Returns the schemas stored for 'url', or None if there aren't any or
+        they are older than the ttl and 'stale' is False.
+        """
+        path = self.path(url)
+
+        try:
+            if not stale and time.time() - os.path.getmtime(path) >= self.ttl:
+                return None
+
+            with open(path, "r") as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def store(self, url, schemas):
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+        # Write to a temporary file first, so a concurrently starting client
+        #   never reads a partially written schema.
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(schemas, f)
+
+            if hasattr(os, "replace"):
+                os.replace(tmp, self.path(url))
+            else:
+                if os.path.exists(self.path(url)):
+                    os.remove(self.path(url))
+                os.rename(tmp, self.path(url))
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+
+def fetch_schemas(api):
+    """
+    Returns a dict mapping each resource_name of the API to its schema. The
+    schemas are requested along with the top level index, and fetched
+    individually if the API doesn't include them there.
+    """
+    index = api.deserialize_response(api.http_resource("GET", api.url, params={"fullschema": "true"}))
+
+    schemas = {}
+    missing = []
+
+    for resource_name, info in index.items():
+        schema = info.get("schema")
+
+        if isinstance(schema, dict):
+            schemas[resource_name] = schema
+        elif schema:
+            missing.append((resource_name, schema))
+
+    def fetch(item):
+        return item[0], api.deserialize_response(api.http_resource("GET", item[1]))
+
+    if len(missing) > 1:
+        with thread_pool(min(SCHEMA_WORKERS, len(missing))) as pool:
+            schemas.update(pool.map(fetch, missing))
+    else:
+        schemas.update(fetch(item) for item in missing)
+
+    return schemas
+
+
+def resource_name_for(url):
+    """
+    Returns the resource_name from the url of a resource's schema or list
+    endpoint, such as "/api/v1/category/schema/".
+    """
+    parts = [p for p in urllib_parse.urlparse(url).path.split("/") if p]
+
+    if parts and parts[-1] == "schema":
+        parts = parts[:-1]
+
+    return parts[-1] if parts else None
+
+
+def class_name_for(resource_name):
+    return str("".join(part.capitalize() for part in resource_name.split("_")))
+
+
+def field_for(name, info, classes):
+    """
+    Returns the Field for a field of a Tastypie schema, given the generated
+    Resource classes by resource_name.
+    """
+    serialize = not info.get("readonly", False)
+
+    if info.get("type") == "related":
+        related = classes.get(resource_name_for(info.get("related_schema") or ""))
+
+        # Related resources which aren't part of the API are left as uris.
+        if related is not None:
+            if info.get("related_type") == "to_many":
+                return ToManyField(related, name=name, serialize=serialize)
+            return ToOneField(related, name=name, serialize=serialize)
+
+    return FIELD_TYPES.get(info.get("type"), Field)(name=name, serialize=serialize)
+
+
+def build_resources(api, schemas):
+    """
+    Creates and binds a Resource class to 'api' for each of the schemas.
+    """
+    meta_attrs = {"api": api}
+    classes = {}
+
+    # Create every class before adding the fields, so related fields can
+    #   refer to any of them regardless of the order.
+    for resource_name in sorted(schemas):
+        meta = type(str("Meta"), (object,), dict(meta_attrs, resource_name=resource_name))
+        classes[resource_name] = type(Resource)(class_name_for(resource_name), (Resource,), {
+            "__module__": __name__,
+            "Meta": meta,
+        })
+
+    for resource_name, cls in classes.items():
+        for name, info in schemas[resource_name].get("fields", {}).items():
+            if name == "resource_uri":
+                continue
+
+            cls._meta.add_field(field_for(name, info, classes))
+
+    return classes
@@ -0,0 +1,125 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class Serializer(object):
+    """
+    Base class for the serializers used to encode requests and decode
+    responses for a given content type.
+    """
+
+    content_type = None
+
+    def dumps(self, o):
+        raise NotImplementedError
+
+    def loads(self, s):
+        """
+        Returns the deserialization of 's', which may be bytes or text. Raises
+        ValueError if it is not valid.
+        """
+        raise NotImplementedError
+
+
+class JSONSerializer(Serializer):
+
+    content_type = "application/json"
+
+    def dumps(self, o):
+        return json.dumps(o)
+
+    def loads(self, s):
+        # The json module detects the encoding of bytes itself, so there's no
+        #   need to decode them to text first.
+        return json.loads(s)
+
+
+class OrjsonSerializer(JSONSerializer):
+
+    def dumps(self, o):
+        return orjson.dumps(o)
+
+    def loads(self, s):
+        return orjson.loads(s)
+
+
+class UjsonSerializer(JSONSerializer):
+
+    def dumps(self, o):
+        return ujson.dumps(o)
+
+    def loads(self, s):
+        return ujson.loads(s)
+
+
+class MsgpackSerializer(Serializer):
+    """
+    A compact binary format, which the server must have a Tastypie serializer
+    for.
+    """
+
+    content_type = "application/x-msgpack"
+
+    def dumps(self, o):
+        return msgpack.packb(o, use_bin_type=True)
+
+    def loads(self, s):
+        try:
+            return msgpack.unpackb(s, raw=False)
+        except Exception as e:
+            raise ValueError(str(e))
+
+
+class SerializerRegistry(object):
+    """
+    Maps content types to the serializer used for them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(SerializerRegistry, self).__init__(*args, **kwargs)
+
+        self._serializers = {}
+
+    def __contains__(self, content_type):
+        return content_type in self._serializers
+
+    def register(self, serializer):
+        self._serializers[serializer.content_type] = serializer
+
+    def unregister(self, content_type):
+        self._serializers.pop(content_type, None)
+
+    def get(self, content_type, default=None):
+        return self._serializers.get(content_type, default)
+
+
+def json_serializer():
+    """
+    Returns a serializer using the fastest installed JSON implementation.
+    """
+    if orjson is not None:
+        return OrjsonSerializer()
+    if ujson is not None:
+        return UjsonSerializer()
+    return JSONSerializer()
+
+
+registry = SerializerRegistry()
+registry.register(json_serializer())
+
+if msgpack is not None:
+    registry.register(MsgpackSerializer())
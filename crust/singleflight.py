@@ -0,0 +1,80 @@
+import threading
+
+from . import six
+
+if six.PY3:
+    import urllib.parse as urllib_parse
+else:
+    import urllib as urllib_parse
+
+
+class Call(object):
+    """
+    A call in flight, which other callers of the same key wait for.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(Call, self).__init__(*args, **kwargs)
+
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Coalesces concurrent identical calls, so that while a call for a key is in
+    flight any other caller with the same key waits for it and shares its
+    result (or exception) rather than making the call itself.
+
+    Only calls which overlap are coalesced, nothing is kept once a call has
+    finished. The 'futures' dict is used by AsyncApi to do the same for
+    coroutines.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(SingleFlight, self).__init__(*args, **kwargs)
+
+        self.futures = {}
+
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(method, url, params=None):
+        if not params:
+            return (method.upper(), url)
+        return (method.upper(), url, urllib_parse.urlencode(sorted(params.items())))
+
+    def do(self, key, fn):
+        """
+        Returns the result of calling 'fn', or of the call for 'key' which is
+        already in flight.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = self._calls[key] = Call()
+
+        if not leader:
+            call.done.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+            call.done.set()
+
+        return call.result
@@ -0,0 +1,206 @@
+import bisect
+import threading
+
+
+# The upper bounds, in seconds, of the buckets of the latency histograms.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram(object):
+    """
+    Counts observations in cumulative buckets, as Prometheus does.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, *args, **kwargs):
+        super(Histogram, self).__init__(*args, **kwargs)
+
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+
+        if i < len(self.counts):
+            self.counts[i] += 1
+
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """
+        Returns a list of (upper bound, number of observations <= it), ending
+        with the "+Inf" bucket.
+        """
+        result = []
+        total = 0
+
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+
+        result.append(("+Inf", self.count))
+
+        return result
+
+
+class StatsCollector(object):
+    """
+    Aggregates the events emitted by an Api into counters and latency
+    histograms labelled by resource and HTTP method.
+
+        stats = StatsCollector()
+        api = MyApi(stats=stats)
+        ...
+        print(stats.prometheus())
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, *args, **kwargs):
+        super(StatsCollector, self).__init__(*args, **kwargs)
+
+        self.buckets = buckets
+
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def install(self, api):
+        """
+        Starts collecting the events emitted by 'api'.
+        """
+        api.add_hook("request", self.on_request)
+        api.add_hook("deserialize", self.on_deserialize)
+        api.add_hook("hydrate", self.on_hydrate)
+        api.add_hook("results", self.on_results)
+
+    def uninstall(self, api):
+        api.remove_hook("request", self.on_request)
+        api.remove_hook("deserialize", self.on_deserialize)
+        api.remove_hook("hydrate", self.on_hydrate)
+        api.remove_hook("results", self.on_results)
+
+    def increment(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            try:
+                histogram = self._histograms[key]
+            except KeyError:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+
+            histogram.observe(value)
+
+    def on_request(self, method, url, resource, status, bytes, seconds, error=None, **kwargs):
+        labels = {"resource": resource, "method": method}
+
+        self.increment("requests_total", dict(labels, status=str(status) if status is not None else "error"))
+        self.increment("response_bytes_total", labels, bytes)
+        self.observe("request_seconds", labels, seconds)
+
+    def on_deserialize(self, content_type, bytes, seconds, **kwargs):
+        labels = {"content_type": content_type}
+
+        self.increment("deserialize_bytes_total", labels, bytes)
+        self.observe("deserialize_seconds", labels, seconds)
+
+    def on_hydrate(self, resource, seconds, **kwargs):
+        labels = {"resource": resource}
+
+        self.increment("hydrated_objects_total", labels)
+        self.increment("hydrate_seconds_total", labels, seconds)
+
+    def on_results(self, resource, pages, objects, seconds, **kwargs):
+        labels = {"resource": resource}
+
+        self.increment("results_total", labels)
+        self.increment("results_pages_total", labels, pages)
+        self.increment("results_objects_total", labels, objects)
+
+    def counter(self, name, **labels):
+        """
+        Returns the value of a counter, summed over any labels not given.
+        """
+        with self._lock:
+            return sum(value for (n, key), value in self._counters.items() if n == name and set(labels.items()) <= set(key))
+
+    def snapshot(self):
+        """
+        Returns a dict of the current values, for example:
+
+            {"counters": {"requests_total": [({"resource": ...}, 3)]},
+             "histograms": {"request_seconds": [({...}, {"count": 3, "sum": 0.2,
+                                                           "buckets": [...]})]}}
+        """
+        with self._lock:
+            counters = {}
+            histograms = {}
+
+            for (name, labels), value in sorted(self._counters.items()):
+                counters.setdefault(name, []).append((dict(labels), value))
+
+            for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+                histograms.setdefault(name, []).append((dict(labels), {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "buckets": histogram.cumulative(),
+                }))
+
+        return {"counters": counters, "histograms": histograms}
+
+    def prometheus(self, prefix="crust"):
+        """
+        Returns the current values in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        for name, values in sorted(snapshot["counters"].items()):
+            name = "{0}_{1}".format(prefix, name)
+            lines.append("# TYPE {0} counter".format(name))
+
+            for labels, value in values:
+                lines.append("{0}{1} {2}".format(name, _labels(labels), _number(value)))
+
+        for name, values in sorted(snapshot["histograms"].items()):
+            name = "{0}_{1}".format(prefix, name)
+            lines.append("# TYPE {0} histogram".format(name))
+
+            for labels, histogram in values:
+                for bound, count in histogram["buckets"]:
+                    lines.append("{0}_bucket{1} {2}".format(name, _labels(dict(labels, le=_number(bound))), count))
+
+                lines.append("{0}_sum{1} {2}".format(name, _labels(labels), _number(histogram["sum"])))
+                lines.append("{0}_count{1} {2}".format(name, _labels(labels), histogram["count"]))
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+
+    escaped = []
+
+    for key, value in sorted(labels.items()):
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        escaped.append('{0}="{1}"'.format(key, value))
+
+    return "{" + ",".join(escaped) + "}"
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
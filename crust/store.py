@@ -0,0 +1,209 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from . import requests
+from .cache import CacheEntry, ResponseCache
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    reason TEXT,
+    url TEXT,
+    encoding TEXT,
+    headers TEXT NOT NULL,
+    content BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+
+-- The total size of the responses, kept by the triggers below so that it
+--   needn't be summed on every write.
+CREATE TABLE IF NOT EXISTS metadata (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO metadata (name, value) SELECT 'size', COALESCE(SUM(size), 0) FROM responses;
+
+CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses BEGIN
+    UPDATE metadata SET value = value + NEW.size WHERE name = 'size';
+END;
+CREATE TRIGGER IF NOT EXISTS responses_update AFTER UPDATE OF size ON responses BEGIN
+    UPDATE metadata SET value = value - OLD.size + NEW.size WHERE name = 'size';
+END;
+CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses BEGIN
+    UPDATE metadata SET value = value - OLD.size WHERE name = 'size';
+END;
+"""
+
+
+class PersistentStore(ResponseCache):
+    """
+    A ResponseCache which keeps the responses in a SQLite database at 'path',
+    so that they survive restarts and can be shared by several processes on
+    the same host.
+
+    As with ResponseCache, responses younger than 'max_age' seconds are used
+    without a request and older ones are revalidated. Once the stored
+    responses exceed 'max_size' bytes the least recently used are evicted.
+
+    If 'stale_if_error' is True a stored response is used, however old, when
+    the API can't be reached or fails with a 5xx. Responses older than 'ttl'
+    seconds are then always revalidated, otherwise they are discarded.
+    """
+
+    def __init__(self, path, max_age=0, ttl=None, max_size=100 * 1024 * 1024, stale_if_error=True, *args, **kwargs):
+        # The entries are kept in the database rather than an LRUCache.
+        super(PersistentStore, self).__init__(maxsize=0, max_age=max_age, stale_if_error=stale_if_error, *args, **kwargs)
+
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        # In one transaction, so that no response is written between the
+        #   total being summed and the triggers being created.
+        self.connection().executescript("BEGIN IMMEDIATE;" + SCHEMA + "COMMIT;")
+
+    def __len__(self):
+        return self.connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def connection(self):
+        """
+        Returns the connection of the current thread, since a sqlite3
+        connection can't be shared between threads.
+        """
+        conn = getattr(self._local, "conn", None)
+
+        if conn is None:
+            # Autocommit, so that readers never hold a transaction open.
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+            # Write-ahead logging lets other processes read while one writes.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Otherwise the rows replaced by INSERT OR REPLACE don't fire the
+            #   delete trigger, and the total size would drift.
+            conn.execute("PRAGMA recursive_triggers=ON")
+
+            self._local.conn = conn
+
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def get(self, key):
+        now = time.time()
+        conn = self.connection()
+
+        row = conn.execute(
+            "SELECT status, reason, url, encoding, headers, content, stored_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        status, reason, url, encoding, headers, content, stored_at = row
+
+        if self.ttl is not None and now - stored_at >= self.ttl and not self.stale_if_error:
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            return None
+
+        conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+
+        r = requests.Response()
+        r.status_code = status
+        r.reason = reason
+        r.url = url
+        r.encoding = encoding
+        r.headers.update(json.loads(headers))
+        r._content = bytes(content)
+        r._content_consumed = True
+
+        return CacheEntry(r, stored_at)
+
+    def is_fresh(self, entry):
+        if self.ttl is not None and entry.age >= self.ttl:
+            return False
+
+        return super(PersistentStore, self).is_fresh(entry)
+
+    def set(self, key, response):
+        if not (self.max_age or "ETag" in response.headers or "Last-Modified" in response.headers):
+            return
+
+        now = time.time()
+        content = response.content or b""
+
+        conn = self.connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, status, reason, url, encoding, headers, content, size, stored_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, response.status_code, response.reason, response.url, response.encoding,
+             json.dumps(dict(response.headers)), sqlite3.Binary(content), len(content), now, now),
+        )
+
+        self.evict()
+
+    def size(self):
+        """
+        Returns the total size in bytes of the stored responses.
+        """
+        return self.connection().execute("SELECT value FROM metadata WHERE name = 'size'").fetchone()[0]
+
+    def evict(self):
+        """
+        Discards expired responses, then the least recently used ones until
+        the store is within max_size.
+        """
+        conn = self.connection()
+
+        if self.ttl is not None and not self.stale_if_error:
+            conn.execute("DELETE FROM responses WHERE stored_at < ?", (time.time() - self.ttl,))
+
+        if self.max_size is None:
+            return
+
+        total = self.size()
+
+        if total <= self.max_size:
+            return
+
+        excess = total - self.max_size
+        keys = []
+
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            keys.append((key,))
+            excess -= size
+
+            if excess <= 0:
+                break
+
+        conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+
+    def revalidated(self, key, entry):
+        super(PersistentStore, self).revalidated(key, entry)
+
+        self.connection().execute("UPDATE responses SET stored_at = ? WHERE key = ?", (entry.stored_at, key))
+
+    def invalidate(self, prefix):
+        self.connection().execute("DELETE FROM responses WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+    def clear(self):
+        self.connection().execute("DELETE FROM responses")
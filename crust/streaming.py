@@ -0,0 +1,188 @@
+import codecs
+import json
+
+from .exceptions import ResponseError
+
+
+# The number of bytes read from a streamed response at a time.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = " \t\n\r"
+
+
+class DecodedPage(object):
+    """
+    A page of a list endpoint which has already been decoded, with the same
+    interface as a StreamingPage.
+    """
+
+    def __init__(self, data, collection="objects", *args, **kwargs):
+        super(DecodedPage, self).__init__(*args, **kwargs)
+
+        self.meta = data.get("meta")
+        self.bytes_read = None
+        self.extra = dict([(k, v) for k, v in data.items() if k not in ("meta", collection)])
+
+        self._objects = data.get(collection, [])
+
+    def __iter__(self):
+        return iter(self._objects)
+
+    def close(self):
+        pass
+
+
+class StreamingPage(object):
+    """
+    Incrementally decodes a page of a list endpoint, i.e. a JSON object such as
+    {"meta": {...}, "objects": [...]}, from an iterable of byte chunks.
+
+    Iterating over it yields each of the objects as soon as it has been
+    received, without holding the rest of the page in memory. The meta (and
+    any other top level keys) are available once they have been read, which
+    at the latest is when the iteration has finished.
+    """
+
+    def __init__(self, chunks, encoding="utf-8", collection="objects", close=None, *args, **kwargs):
+        super(StreamingPage, self).__init__(*args, **kwargs)
+
+        self.meta = None
+        self.extra = {}
+        self.collection = collection
+
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._close = close
+
+        self.bytes_read = 0
+
+        self._buf = ""
+        self._pos = 0
+        self._exhausted = False
+
+        self._json = json.JSONDecoder()
+
+    def __iter__(self):
+        try:
+            self._expect("{")
+
+            if self._peek() == "}":
+                self._pos += 1
+                return
+
+            while True:
+                key = self._value()
+                self._expect(":")
+
+                if key == self.collection:
+                    for obj in self._array():
+                        yield obj
+                elif key == "meta":
+                    self.meta = self._value()
+                else:
+                    self.extra[key] = self._value()
+
+                c = self._next()
+
+                if c == "}":
+                    break
+                elif c != ",":
+                    raise ResponseError("The API Response was not valid.")
+        finally:
+            self.close()
+
+    def close(self):
+        if self._close is not None:
+            self._close()
+            self._close = None
+
+    def _array(self):
+        self._expect("[")
+
+        if self._peek() == "]":
+            self._pos += 1
+            return
+
+        while True:
+            yield self._value()
+
+            c = self._next()
+
+            if c == "]":
+                return
+            elif c != ",":
+                raise ResponseError("The API Response was not valid.")
+
+    def _fill(self):
+        """
+        Reads the next chunk into the buffer, returning False once the stream
+        has been exhausted.
+        """
+        if self._exhausted:
+            return False
+
+        # Discard what has already been decoded so the buffer doesn't grow
+        #   with the size of the page.
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._exhausted = True
+            self._buf += self._decoder.decode(b"", final=True)
+            return False
+
+        self.bytes_read += len(chunk)
+        self._buf += self._decoder.decode(chunk)
+
+        return True
+
+    def _peek(self):
+        """
+        Skips any whitespace and returns the next character without consuming
+        it.
+        """
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in WHITESPACE:
+                self._pos += 1
+
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+
+            if not self._fill():
+                raise ResponseError("The API Response was not valid.")
+
+    def _next(self):
+        c = self._peek()
+        self._pos += 1
+        return c
+
+    def _expect(self, expected):
+        if self._next() != expected:
+            raise ResponseError("The API Response was not valid.")
+
+    def _value(self):
+        """
+        Decodes the JSON value at the current position, reading more of the
+        stream until it is complete.
+        """
+        self._peek()
+
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buf, self._pos)
+            except ValueError:
+                if not self._fill():
+                    raise ResponseError("The API Response was not valid.")
+                continue
+
+            # A number at the end of the buffer may continue in the next chunk.
+            if end == len(self._buf) and isinstance(value, (int, float)) and not isinstance(value, bool):
+                if self._fill():
+                    continue
+
+            self._pos = end
+
+            return value
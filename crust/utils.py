@@ -1,3 +1,12 @@
+import datetime
+import itertools
+import time
+
+
+# The most precise clock available for measuring durations.
+default_timer = getattr(time, "perf_counter", time.time)
+
+
 def unpickle_inner_exception(klass, exception_name):
     # Get the exception class from the class it is attached to:
     exception = getattr(klass, exception_name)
@@ -26,3 +35,75 @@ def subclass_exception(name, parents, module, attached_to=None):
         class_dict['__setstate__'] = __setstate__
 
     return type(name, parents, class_dict)
+
+
+def thread_pool(max_workers):
+    """
+    Returns a ThreadPoolExecutor with 'max_workers' threads.
+    """
+    try:
+        from concurrent.futures import ThreadPoolExecutor
+    except ImportError:
+        raise ImportError("Concurrent requests require concurrent.futures, on Python 2 install the 'futures' package.")
+
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def require_sync(api, operation):
+    """
+    Raises a TypeError if 'api' is asynchronous, since 'operation' makes
+    blocking requests that it can't make.
+    """
+    if api.is_async:
+        raise TypeError("{0} makes blocking requests, so isn't supported by the asynchronous {1}; see crust.aio for the operations which are.".format(operation, api.__class__.__name__))
+
+
+def chunked(iterable, size):
+    """
+    Yields lists of up to 'size' items from 'iterable'.
+    """
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+class FixedOffset(datetime.tzinfo):
+    """
+    A fixed offset from UTC, for Pythons without datetime.timezone.
+    """
+
+    def __init__(self, minutes):
+        self._offset = datetime.timedelta(minutes=minutes)
+        self._name = "%+03d:%02d" % (minutes // 60 if minutes >= 0 else -(-minutes // 60), abs(minutes) % 60)
+
+    def utcoffset(self, dt):
+        return self._offset
+
+    def tzname(self, dt):
+        return self._name
+
+    def dst(self, dt):
+        return datetime.timedelta(0)
+
+
+_offsets = {}
+
+
+def fixed_offset(minutes):
+    """
+    Returns a tzinfo for a fixed offset of 'minutes' from UTC.
+    """
+    try:
+        return _offsets[minutes]
+    except KeyError:
+        if hasattr(datetime, "timezone"):
+            tz = datetime.timezone.utc if not minutes else datetime.timezone(datetime.timedelta(minutes=minutes))
+        else:
+            tz = FixedOffset(minutes)
+        return _offsets.setdefault(minutes, tz)
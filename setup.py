@@ -19,10 +19,13 @@ setup(
     ],
 
     extras_require={
-        "test": ["pytest"]
+        "async": ["aiohttp"],
+        "fast": ["orjson"],
+        "msgpack": ["msgpack"],
+        "test": ["pytest"],
     },
 
-    packages=find_packages(exclude=["tests"]),
+    packages=find_packages(exclude=["tests", "benchmarks", "benchmarks.*"]),
     package_data={"": ["LICENSE"]},
     include_package_data=True,
 
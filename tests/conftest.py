@@ -0,0 +1,198 @@
+import hashlib
+import json
+import threading
+
+import pytest
+
+from crust import requests
+from crust import six
+from crust.api import Api
+from crust.fields import Field, ToOneField, ToManyField
+from crust.resources import Resource
+
+if six.PY3:
+    import urllib.parse as urllib_parse
+else:
+    import urlparse as urllib_parse
+
+
+BASE_URL = "http://example.com/api/v1/"
+
+
+class Backend(object):
+    """
+    A tiny in-memory Tastypie look-alike that a FakeSession routes requests to.
+    """
+
+    def __init__(self, max_limit=1000):
+        self.max_limit = max_limit
+        self.schemas = {}
+        self.data = {}
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def add(self, resource_name, **fields):
+        objects = self.data.setdefault(resource_name, [])
+        pk = len(objects) + 1 if not objects else max(o["id"] for o in objects) + 1
+        obj = dict(fields, id=pk, resource_uri="/api/v1/%s/%s/" % (resource_name, pk))
+        objects.append(obj)
+        return obj
+
+    def respond(self, status=200, body=None, headers=None):
+        r = requests.Response()
+        r.status_code = status
+        r.encoding = "utf-8"
+        r.headers.update(headers or {})
+        if body is not None:
+            r.headers.setdefault("Content-Type", "application/json")
+            r._content = json.dumps(body).encode("utf-8")
+        else:
+            r._content = b""
+        r._content_consumed = True
+        return r
+
+    def __call__(self, method, url, params=None, data=None, headers=None, **kwargs):
+        with self.lock:
+            r = self.handle(method, url, params=params, data=data, headers=headers, **kwargs)
+
+        if method.upper() == "GET" and r.status_code == 200:
+            etag = '"%s"' % hashlib.md5(r.content).hexdigest()
+            r.headers["ETag"] = etag
+
+            if (headers or {}).get("If-None-Match") == etag:
+                return self.respond(status=304, headers={"ETag": etag})
+
+        return r
+
+    def handle(self, method, url, params=None, data=None, headers=None, **kwargs):
+        path = urllib_parse.urlparse(url).path
+        parts = [p for p in path[len("/api/v1/"):].split("/") if p]
+
+        self.requests.append((method.upper(), path, dict(params or {})))
+
+        if not parts:
+            full = (params or {}).get("fullschema") == "true"
+            return self.respond(body=dict((name, {
+                "list_endpoint": "/api/v1/%s/" % name,
+                "schema": schema if full else "/api/v1/%s/schema/" % name,
+            }) for name, schema in self.schemas.items()))
+
+        if method.upper() == "GET" and len(parts) == 2 and parts[1] == "schema":
+            return self.respond(body=self.schemas[parts[0]])
+
+        objects = self.data.setdefault(parts[0], [])
+
+        if method.upper() == "GET" and len(parts) == 1:
+            params = dict(params or {})
+            offset = int(params.pop("offset", 0))
+            limit = int(params.pop("limit", 20))
+            limit = self.max_limit if limit == 0 else min(limit, self.max_limit)
+            order_by = params.pop("order_by", None)
+
+            matched = [o for o in objects if all(self.matches(o, k, v) for k, v in params.items())]
+
+            if order_by:
+                matched.sort(key=lambda o: o[order_by.lstrip("-")], reverse=order_by.startswith("-"))
+            page = matched[offset:offset + limit]
+
+            return self.respond(body={
+                "meta": {"total_count": len(matched), "offset": offset, "limit": limit},
+                "objects": page,
+            })
+
+        if method.upper() == "GET" and len(parts) == 3 and parts[1] == "set":
+            ids = [int(i) for i in parts[2].split(";")]
+            found = [o for o in objects if o["id"] in ids]
+            return self.respond(body={"objects": found, "not_found": [i for i in ids if i not in [o["id"] for o in found]]})
+
+        if method.upper() == "GET" and len(parts) == 2:
+            for obj in objects:
+                if str(obj["id"]) == parts[1]:
+                    return self.respond(body=obj)
+            return self.respond(status=404)
+
+        if method.upper() == "POST" and len(parts) == 1:
+            obj = self.add(parts[0], **json.loads(data))
+            return self.respond(status=201, headers={"Location": "http://example.com" + obj["resource_uri"]})
+
+        if method.upper() == "PUT" and len(parts) == 2:
+            for obj in objects:
+                if str(obj["id"]) == parts[1]:
+                    obj.update(json.loads(data))
+            return self.respond(status=204)
+
+        if method.upper() == "DELETE" and len(parts) == 2:
+            self.data[parts[0]] = [o for o in objects if str(o["id"]) != parts[1]]
+            return self.respond(status=204)
+
+        if method.upper() == "PATCH" and len(parts) == 1:
+            payload = json.loads(data)
+            deleted = set(urllib_parse.urlparse(u).path for u in payload.get("deleted_objects", []))
+            self.data[parts[0]] = [o for o in objects if o["resource_uri"] not in deleted]
+            created = []
+            for item in payload.get("objects", []):
+                uri = item.get("resource_uri")
+                existing = [o for o in self.data[parts[0]] if uri and o["resource_uri"] == urllib_parse.urlparse(uri).path]
+                if existing:
+                    existing[0].update(item)
+                    created.append(existing[0])
+                else:
+                    item.pop("resource_uri", None)
+                    created.append(self.add(parts[0], **item))
+            return self.respond(status=202, body={"objects": created})
+
+        return self.respond(status=405)
+
+    @staticmethod
+    def matches(obj, key, value):
+        if key.endswith("__gt"):
+            return obj[key[:-4]] > int(value)
+        if key.endswith("__lt"):
+            return obj[key[:-4]] < int(value)
+        return str(obj.get(key)) == str(value)
+
+    def count(self, method=None, resource_name=None):
+        return len([r for r in self.requests
+                    if (method is None or r[0] == method)
+                    and (resource_name is None or r[1].startswith("/api/v1/%s/" % resource_name))])
+
+
+class FakeSession(requests.Session):
+
+    def __init__(self, backend):
+        super(FakeSession, self).__init__()
+        self.backend = backend
+
+    def request(self, method, url, params=None, data=None, headers=None, **kwargs):
+        return self.backend(method, url, params=params, data=data, headers=headers, **kwargs)
+
+
+@pytest.fixture
+def backend():
+    return Backend()
+
+
+@pytest.fixture
+def api(backend):
+    class TestApi(Api):
+        url = BASE_URL
+        resources = {}
+
+    class Category(Resource):
+        name = Field()
+
+        class Meta:
+            api = TestApi
+
+    class Book(Resource):
+        title = Field()
+        category = ToOneField(Category)
+        tags = ToManyField(Category)
+
+        class Meta:
+            api = TestApi
+
+    api = TestApi(session=FakeSession(backend))
+    api.backend = backend
+
+    return api
@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+from crust.aio import AsyncApi, resolve
+from crust.fields import Field, ToOneField
+from crust.resources import Resource
+
+from conftest import BASE_URL
+
+
+class FakeAsyncResponse(object):
+
+    def __init__(self, response):
+        self.status = response.status_code
+        self.reason = response.reason
+        self.url = response.url
+        self.headers = response.headers
+        self.charset = "utf-8"
+        self._content = response.content
+
+    async def read(self):
+        return self._content
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeAsyncSession(object):
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def request(self, method, url, params=None, data=None, headers=None):
+        return FakeAsyncResponse(self.backend(method, url, params=params, data=data, headers=headers))
+
+
+@pytest.fixture
+def async_api(backend):
+    class TestAsyncApi(AsyncApi):
+        url = BASE_URL
+        resources = {}
+
+    class Category(Resource):
+        name = Field()
+
+        class Meta:
+            api = TestAsyncApi
+
+    class Book(Resource):
+        title = Field()
+        category = ToOneField(Category)
+
+        class Meta:
+            api = TestAsyncApi
+
+    api = TestAsyncApi(session=FakeAsyncSession(backend))
+    api.backend = backend
+
+    return api
+
+
+def test_async_iteration(async_api):
+    for i in range(150):
+        async_api.backend.add("category", name="c%s" % i)
+
+    async def names():
+        return [c.name async for c in async_api.category.objects.all()]
+
+    assert asyncio.run(names()) == ["c%s" % i for i in range(150)]
+
+
+def test_async_stats(async_api):
+    from crust.stats import StatsCollector
+
+    for i in range(150):
+        async_api.backend.add("category", name="c%s" % i)
+
+    stats = StatsCollector()
+    stats.install(async_api)
+
+    async def names():
+        return [c.name async for c in async_api.category.objects.all()]
+
+    assert len(asyncio.run(names())) == 150
+
+    assert stats.counter("requests_total", resource="category") == 2
+    assert stats.counter("hydrated_objects_total", resource="category") == 150
+    assert stats.counter("results_pages_total", resource="category") == 2
+    assert stats.counter("results_objects_total", resource="category") == 150
+
+
+def test_async_count_and_get(async_api):
+    async_api.backend.add("category", name="a")
+    async_api.backend.add("category", name="b")
+
+    assert asyncio.run(async_api.category.objects.count()) == 2
+    assert asyncio.run(async_api.category.objects.get(name="b")).name == "b"
+
+    with pytest.raises(async_api.category.DoesNotExist):
+        asyncio.run(async_api.category.objects.get(name="c"))
+
+
+def test_async_save_and_delete(async_api):
+    obj = asyncio.run(async_api.category.objects.create(name="a"))
+    assert obj.resource_uri == "/api/v1/category/1/"
+
+    obj.name = "b"
+    asyncio.run(obj.save())
+    assert async_api.backend.data["category"][0]["name"] == "b"
+
+    asyncio.run(obj.delete())
+    assert async_api.backend.data["category"] == []
+
+
+def test_async_get_or_create(async_api):
+    obj, created = asyncio.run(async_api.category.objects.get_or_create(name="a"))
+    assert created
+    assert obj.resource_uri == "/api/v1/category/1/"
+
+    obj, created = asyncio.run(async_api.category.objects.get_or_create(name="a"))
+    assert not created
+    assert len(async_api.backend.data["category"]) == 1
+
+
+def test_async_resolve_related(async_api):
+    category = async_api.backend.add("category", name="c")
+    async_api.backend.add("book", title="b", category=category["resource_uri"])
+
+    book = asyncio.run(async_api.book.objects.get(title="b"))
+
+    with pytest.raises(TypeError):
+        book.category.name
+
+    assert asyncio.run(resolve(book.category)).name == "c"
+    assert book.category.name == "c"
+
+
+def test_async_prefetch_related(async_api):
+    categories = [async_api.backend.add("category", name="c%s" % i) for i in range(5)]
+    for i in range(150):
+        async_api.backend.add("book", title="b%s" % i, category=categories[i % 5]["resource_uri"])
+
+    async def names():
+        return [b.category.name async for b in async_api.book.objects.prefetch_related("category")]
+
+    assert asyncio.run(names())[:6] == ["c0", "c1", "c2", "c3", "c4", "c0"]
+    assert async_api.backend.count("GET", "category") == 2
+
+
+def test_async_blocking_operations(async_api):
+    for operation in (len, list, lambda qs: qs[0], lambda qs: qs.exists(), lambda qs: qs.delete(), lambda qs: qs.bulk_create([])):
+        with pytest.raises(TypeError):
+            operation(async_api.category.objects.all())
@@ -0,0 +1,70 @@
+from crust.api import Api
+from crust.cache import LRUCache, ResponseCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.keys() == ["a", "c"]
+
+
+def test_revalidates_with_etag(api):
+    api.cache = ResponseCache()
+    obj = api.backend.add("category", name="a")
+
+    first = api.deserialize_response(api.http_resource("GET", obj["resource_uri"]))
+    second = api.deserialize_response(api.http_resource("GET", obj["resource_uri"]))
+
+    assert first == second
+    assert api.backend.count("GET") == 2
+    assert len(api.cache) == 1
+
+
+def test_cached_responses_are_not_shared(api):
+    api.cache = ResponseCache()
+    api.backend.add("category", name=["x"])
+
+    category = list(api.category.objects.all())[0]
+    category.name.append("local")
+
+    # Revalidated with a 304, so built from the cached response again.
+    assert list(api.category.objects.all())[0].name == ["x"]
+    assert api.backend.count("GET") == 2
+
+
+def test_fresh_responses_skip_the_request(api):
+    api.cache = ResponseCache(max_age=60)
+    api.backend.add("category", name="a")
+
+    assert api.category.objects.count() == 1
+    assert api.category.objects.count() == 1
+    assert api.backend.count("GET") == 1
+
+
+def test_writes_invalidate_the_resource(api):
+    api.cache = ResponseCache(max_age=60)
+    obj = api.category.objects.create(name="a")
+    api.book.objects.count()
+
+    assert api.category.objects.count() == 1
+
+    obj.name = "b"
+    obj.save()
+
+    assert api.category.objects.get(name="b").name == "b"
+    assert api.backend.count("GET", "category") == 4
+    assert api.book.objects.count() == 0
+    assert api.backend.count("GET", "book") == 1
+
+
+def test_cache_class_attribute():
+    class CachedApi(Api):
+        resources = {}
+        cache = ResponseCache()
+
+    assert CachedApi().cache is CachedApi.cache
+    assert CachedApi(cache=ResponseCache()).cache is not CachedApi.cache
@@ -0,0 +1,58 @@
+import datetime
+
+import pytest
+
+from crust import dateparse
+from crust.exceptions import FieldError
+from crust.fields import DateField, DateTimeField, TimeField
+from crust.utils import fixed_offset
+
+
+@pytest.mark.parametrize(("value", "expected"), [
+    ("2013-01-02T03:04:05", datetime.datetime(2013, 1, 2, 3, 4, 5)),
+    ("2013-01-02 03:04:05.123456", datetime.datetime(2013, 1, 2, 3, 4, 5, 123456)),
+    ("2013-01-02T03:04:05.12Z", datetime.datetime(2013, 1, 2, 3, 4, 5, 120000, fixed_offset(0))),
+    ("2013-01-02T03:04:05-0130", datetime.datetime(2013, 1, 2, 3, 4, 5, 0, fixed_offset(-90))),
+    ("2013-01-02T03:04:05.1234567+01:00", datetime.datetime(2013, 1, 2, 3, 4, 5, 123456, fixed_offset(60))),
+])
+def test_parse_datetime(value, expected):
+    parsed = DateTimeField().hydrate(value)
+
+    assert parsed == expected
+    assert parsed.utcoffset() == expected.utcoffset()
+
+
+def test_regex_fallback_matches_fast_path(monkeypatch):
+    value = "2013-01-02T03:04:05.5+02:00"
+    fast = dateparse.parse_datetime(value)
+
+    monkeypatch.setattr(dateparse, "fromisoformat", None)
+
+    assert dateparse.parse_datetime(value) == fast
+    assert dateparse.parse_datetime("2013-13-02T03:04:05") is None
+
+
+def test_invalid_datetime():
+    with pytest.raises(FieldError):
+        DateTimeField(name="created").hydrate("yesterday")
+
+
+def test_datetime_cache():
+    assert DateTimeField("created").name == "created"
+
+    field = DateTimeField("created", cache_size=2)
+
+    first = field.hydrate("2013-01-02T03:04:05")
+    assert field.hydrate("2013-01-02T03:04:05") is first
+
+    field.hydrate("2013-01-03T03:04:05")
+    field.hydrate("2013-01-04T03:04:05")
+    assert len(field._cache) == 1
+
+
+def test_date_and_time_fields():
+    assert DateField().hydrate("2013-01-02") == datetime.date(2013, 1, 2)
+    assert DateField().hydrate("2013-01-02T03:04:05") == datetime.date(2013, 1, 2)
+    assert DateField().dehydrate(datetime.date(2013, 1, 2)) == "2013-01-02"
+    assert TimeField().hydrate("03:04:05.5") == datetime.time(3, 4, 5, 500000)
+    assert TimeField().dehydrate(datetime.time(3, 4)) == "03:04:00"
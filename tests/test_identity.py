@@ -0,0 +1,102 @@
+import time
+
+from crust.api import Api
+from crust.identity import IdentityMap
+
+
+def test_identity_map_shares_related_objects(api):
+    api.identity_map = IdentityMap()
+
+    categories = [api.backend.add("category", name="c%s" % i) for i in range(3)]
+    for i in range(60):
+        api.backend.add("book", title="b%s" % i, category=categories[i % 3]["resource_uri"], tags=[])
+
+    books = list(api.book.objects.all())
+    names = [b.category.name for b in books]
+
+    assert names[:4] == ["c0", "c1", "c2", "c0"]
+    assert api.backend.count("GET", "category") == 3
+    assert books[0].category.__dict__ is books[3].category.__dict__
+
+
+def test_identity_map_iterator_returns_same_object(api):
+    api.identity_map = IdentityMap()
+    api.backend.add("category", name="a")
+
+    first = list(api.category.objects.all())[0]
+    second = list(api.category.objects.all())[0]
+
+    assert first is second
+
+
+def test_identity_map_keeps_unsaved_changes(api):
+    api.identity_map = IdentityMap()
+    category = api.backend.add("category", name="a")
+
+    obj = list(api.category.objects.all())[0]
+    obj.name = "local"
+    category["name"] = "remote"
+
+    assert list(api.category.objects.all())[0] is obj
+    assert obj.name == "local"
+
+
+def test_identity_map_refresh(api):
+    api.identity_map = IdentityMap(refresh=True)
+    category = api.backend.add("category", name="a")
+
+    obj = list(api.category.objects.all())[0]
+    obj.name = "local"
+    category["name"] = "remote"
+
+    assert list(api.category.objects.all())[0] is obj
+    assert obj.name == "remote"
+
+
+def test_identity_map_forgets_deleted_objects(api):
+    api.identity_map = IdentityMap()
+    obj = api.category.objects.create(name="a")
+
+    assert api.identity_map.get(obj.resource_uri) is obj
+
+    obj.delete()
+
+    assert api.identity_map.get(obj.resource_uri) is None
+
+
+def test_identity_map_forgets_bulk_deleted_objects(api):
+    api.identity_map = IdentityMap()
+    for i in range(150):
+        api.backend.add("category", name="a" if i % 2 else "b")
+
+    objs = list(api.category.objects.all())
+    api.category.objects.filter(name="a").delete()
+
+    assert api.identity_map.get(objs[0].resource_uri) is objs[0]
+    assert [obj for obj in objs[1::2] if api.identity_map.get(obj.resource_uri) is not None] == []
+
+
+def test_identity_map_bounds(api):
+    identity_map = IdentityMap(maxsize=2, ttl=60)
+    objs = [api.category(resource_uri="/api/v1/category/%s/" % i) for i in range(3)]
+
+    for obj in objs:
+        identity_map.add(obj)
+
+    assert len(identity_map) == 2
+    assert identity_map.get("http://example.com/api/v1/category/0/") is None
+    assert identity_map.get("http://example.com/api/v1/category/2/") is objs[2]
+
+    identity_map.ttl = 0
+    time.sleep(0.01)
+
+    assert identity_map.get("/api/v1/category/2/") is None
+
+
+def test_identity_map_class_attribute():
+    class MapApi(Api):
+        resources = {}
+        identity_map = IdentityMap()
+
+    assert MapApi().identity_map is MapApi.identity_map
+    assert MapApi(identity_map=IdentityMap()).identity_map is not MapApi.identity_map
@@ -0,0 +1,43 @@
+from crust.api import Api
+
+from conftest import BASE_URL, FakeSession
+
+
+class PoolApi(Api):
+    url = BASE_URL
+    resources = {}
+
+
+def test_session_pool_options():
+    api = PoolApi(pool_connections=2, pool_maxsize=20, pool_block=True)
+    adapter = api.session.get_adapter(BASE_URL)
+
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 20
+    assert adapter._pool_block is True
+    assert api.session.headers["Connection"] == "keep-alive"
+
+    api = PoolApi(keep_alive=False)
+    assert api.session.headers["Connection"] == "close"
+
+
+def test_timeout_is_passed(backend):
+    timeouts = []
+
+    class TimeoutSession(FakeSession):
+        def request(self, method, url, **kwargs):
+            timeouts.append(kwargs.get("timeout"))
+            return super(TimeoutSession, self).request(method, url, **kwargs)
+
+    api = PoolApi(session=TimeoutSession(backend), timeout=(3.05, 27))
+    api.http_resource("GET", "category")
+
+    assert timeouts == [(3.05, 27)]
+
+
+def test_warm_up(backend):
+    api = PoolApi(session=FakeSession(backend), pool_maxsize=4)
+
+    assert api.warm_up() == 4
+    assert backend.count("HEAD") == 4
+    assert api.warm_up(2) == 2
@@ -0,0 +1,321 @@
+def test_iterates_all_pages(api):
+    for i in range(250):
+        api.backend.add("category", name="c%s" % i)
+
+    names = [c.name for c in api.category.objects.all()]
+
+    assert names == ["c%s" % i for i in range(250)]
+    assert api.backend.count("GET") == 3
+
+
+def test_prefetch_preserves_order(api):
+    for i in range(1050):
+        api.backend.add("category", name="c%s" % i)
+
+    names = [c.name for c in api.category.objects.prefetch(pages=3)]
+
+    assert names == ["c%s" % i for i in range(1050)]
+    assert api.backend.count("GET") == 11
+
+
+def test_prefetch_respects_slicing(api):
+    for i in range(500):
+        api.backend.add("category", name="c%s" % i)
+
+    names = [c.name for c in api.category.objects.prefetch(pages=2)[150:420]]
+
+    assert names == ["c%s" % i for i in range(150, 420)]
+
+
+def test_open_ended_slice_stops(api):
+    for i in range(30):
+        api.backend.add("category", name="c%s" % i)
+
+    names = [c.name for c in api.category.objects.all()[10:]]
+
+    assert names == ["c%s" % i for i in range(10, 30)]
+
+
+def test_prefetch_related_uses_set_endpoint(api):
+    categories = [api.backend.add("category", name="c%s" % i) for i in range(5)]
+    for i in range(150):
+        api.backend.add("book", title="b%s" % i,
+                        category=categories[i % 5]["resource_uri"],
+                        tags=[categories[0]["resource_uri"], categories[(i + 1) % 5]["resource_uri"]])
+
+    books = list(api.book.objects.prefetch_related("category", "tags"))
+    names = [(b.category.name, [t.name for t in b.tags]) for b in books]
+
+    assert names[7] == ("c2", ["c0", "c3"])
+    assert api.backend.count("GET", "category") == 4
+    assert api.backend.count("GET", "book") == 2
+
+
+def test_bulk_create_and_update(api):
+    objs = [api.category(name="c%s" % i) for i in range(250)]
+
+    api.category.objects.bulk_create(objs)
+
+    assert api.backend.count("PATCH") == 3
+    assert objs[249].resource_uri == "/api/v1/category/250/"
+
+    for obj in objs[:10]:
+        obj.name = "updated"
+
+    api.category.objects.bulk_update(objs[:10], fields=["name"], batch_size=5)
+
+    assert api.backend.count("PATCH") == 5
+    assert [o["name"] for o in api.backend.data["category"][8:12]] == ["updated", "updated", "c10", "c11"]
+
+    # Generators are accepted as well.
+    created = api.category.objects.bulk_create(api.category(name="g%s" % i) for i in range(3))
+
+    assert [obj.resource_uri for obj in created] == ["/api/v1/category/%s/" % i for i in range(251, 254)]
+
+    api.category.objects.bulk_update(obj for obj in created)
+    assert api.backend.count("PATCH") == 7
+
+
+def test_delete_in_chunks(api):
+    for i in range(250):
+        api.backend.add("category", name="a" if i % 2 else "b")
+
+    progress = []
+
+    assert api.category.objects.filter(name="a").delete(callback=progress.append) == 125
+    assert progress == [100, 125]
+    assert api.backend.count("PATCH") == 2
+    assert len(api.backend.data["category"]) == 125
+
+
+def test_delete_concurrently(api):
+    for i in range(450):
+        api.backend.add("category", name="a")
+
+    assert api.category.objects.delete(workers=2) == 450
+    assert api.backend.count("PATCH") == 5
+    assert api.backend.data["category"] == []
+
+
+def test_values_and_values_list(api):
+    api.backend.add("book", title="a", category=None, tags=[], created="2013-01-02T03:04:05")
+    api.backend.add("book", title="b", category=None, tags=[])
+
+    assert list(api.book.objects.values("title")) == [{"title": "a"}, {"title": "b"}]
+    assert list(api.book.objects.filter(title="b").values_list("id", "title")) == [(2, "b")]
+    assert list(api.book.objects.values_list("title", flat=True)[1:]) == ["b"]
+    assert api.book.objects.values("title").get(title="a") == {"title": "a"}
+    assert list(api.book.objects.values_list(flat=False))[0] == ("/api/v1/book/1/", "a", None, [])
+
+
+def test_page_size(api):
+    for i in range(250):
+        api.backend.add("category", name="c%s" % i)
+
+    assert len(list(api.category.objects.page_size(50))) == 250
+    assert api.backend.count("GET") == 5
+
+    assert len(list(api.category.objects.page_size(0))) == 250
+    assert api.backend.count("GET") == 6
+
+
+def test_page_size_learns_max_limit(api):
+    api.backend.max_limit = 40
+
+    for i in range(100):
+        api.backend.add("category", name="c%s" % i)
+
+    names = [c.name for c in api.category.objects.page_size(100)[:90]]
+
+    assert names == ["c%s" % i for i in range(90)]
+    assert api.category._meta.max_limit == 40
+    assert [r[2]["limit"] for r in api.backend.requests] == [90, 40, 10]
+
+
+def test_adaptive_limit():
+    from crust.query import AdaptiveLimit
+
+    adaptive = AdaptiveLimit(min_limit=10, max_limit=500, target_seconds=1.0, target_bytes=10000)
+
+    # Fast and small pages grow, but by at most the factor.
+    assert adaptive.next_limit(100, 100, seconds=0.1, nbytes=1000) == 200
+    # Slow pages shrink towards the target.
+    assert adaptive.next_limit(100, 100, seconds=1.5, nbytes=1000) == 66
+    # Large pages shrink towards the target size.
+    assert adaptive.next_limit(100, 100, seconds=0.1, nbytes=20000) == 50
+    # The limit stays within its bounds.
+    assert adaptive.next_limit(400, 400, seconds=0.01) == 500
+    assert adaptive.next_limit(12, 12, seconds=10) == 10
+
+
+def test_adaptive_iterates_all_pages(api):
+    for i in range(300):
+        api.backend.add("category", name="c%s" % i)
+
+    names = [c.name for c in api.category.objects.adaptive(min_limit=20, max_limit=200, target_bytes=2000)]
+
+    assert names == ["c%s" % i for i in range(300)]
+    assert len(set(r[2]["limit"] for r in api.backend.requests)) > 1
+
+
+def test_count_reuses_total_count(api):
+    for i in range(150):
+        api.backend.add("category", name="c%s" % (i % 3))
+
+    qs = api.category.objects.all()
+    list(qs.iterator())
+    requests = api.backend.count("GET")
+
+    assert qs.count() == 150
+    assert qs[10:20].count() == 10
+    assert api.backend.count("GET") == requests
+
+    # Changing the filters needs a new count.
+    assert qs.filter(name="c1").count() == 50
+    assert api.backend.count("GET") == requests + 1
+
+    # As does writing to the resource.
+    api.category(name="c4").save()
+    assert qs.count() == 151
+
+
+def test_count_ttl(api, monkeypatch):
+    for i in range(5):
+        api.backend.add("category", name="c%s" % i)
+
+    qs = api.category.objects.all()
+    assert qs.count() == 5
+    assert qs.count() == 5
+    assert api.backend.count("GET") == 1
+
+    api.category._meta.count_ttl = 0
+    assert qs.count() == 5
+    assert api.backend.count("GET") == 2
+
+
+def test_server_len(api):
+    for i in range(250):
+        api.backend.add("category", name="c%s" % i)
+
+    qs = api.category.objects.server_len()
+
+    assert len(qs) == 250
+    assert qs._result_cache is None
+    assert api.backend.count("GET") == 1
+
+    assert len(list(qs)) == 250
+    assert qs.get(id=2).name == "c1"
+
+
+def test_keyset_pagination(api):
+    for i in range(250):
+        api.backend.add("category", name="c%s" % i)
+
+    names = [c.name for c in api.category.objects.order_by("id").keyset()]
+
+    assert names == ["c%s" % i for i in range(250)]
+    assert [r[2] for r in api.backend.requests] == [
+        {"order_by": "id", "offset": 0, "limit": 100},
+        {"order_by": "id", "offset": 0, "limit": 100, "id__gt": 100},
+        {"order_by": "id", "offset": 0, "limit": 50, "id__gt": 200},
+    ]
+
+
+def test_keyset_descending_slice(api):
+    for i in range(250):
+        api.backend.add("category", name="c%s" % i)
+
+    qs = api.category.objects.order_by("-id").keyset().page_size(40)
+
+    assert [c.name for c in qs[10:100]] == ["c%s" % i for i in range(239, 149, -1)]
+    assert api.backend.requests[-1][2]["id__lt"] == 161
+
+
+def test_keyset_unaffected_by_inserts(api):
+    for i in range(30):
+        api.backend.add("category", name="c%s" % i)
+
+    names = []
+
+    for category in api.category.objects.order_by("id").keyset().page_size(10):
+        names.append(category.name)
+
+        if category.name == "c5":
+            # Shifts every offset by one, but not the ids.
+            api.backend.data["category"].insert(0, {"id": 0, "resource_uri": "/api/v1/category/0/", "name": "new"})
+
+    assert names == ["c%s" % i for i in range(30)]
+
+
+def test_keyset_requires_the_ordering_field(api):
+    import pytest
+    from crust.exceptions import ResponseError
+
+    for i in range(250):
+        api.backend.add("category", name="c%s" % i)
+
+    original = api.backend.respond
+
+    def respond(status=200, body=None, headers=None):
+        # As if the field were excluded from the output of the resource.
+        if body is not None and "objects" in body:
+            body = dict(body, objects=[dict((k, v) for k, v in obj.items() if k != "id") for obj in body["objects"]])
+        return original(status, body, headers)
+
+    api.backend.respond = respond
+
+    with pytest.raises(ResponseError):
+        list(api.category.objects.order_by("id").keyset())
+
+
+def test_keyset_unordered_operations(api):
+    for i in range(3):
+        api.backend.add("category", name="c%s" % i)
+
+    qs = api.category.objects.order_by("id").keyset()
+
+    # Each of these clears the ordering, so pages by offset instead.
+    assert qs.get(id=2).name == "c1"
+    assert qs.exists()
+    assert qs.filter(name="c0").delete() == 1
+    assert [c.name for c in qs] == ["c1", "c2"]
+
+
+def test_export_ndjson(api):
+    import gzip
+    import io
+    import json
+
+    for i in range(250):
+        api.backend.add("category", name="c%s" % i)
+
+    out = io.BytesIO()
+    progress = []
+
+    qs = api.category.objects.all()
+    assert qs.export(out, gzip=True, progress=progress.append) == 250
+    assert qs._result_cache is None
+    assert progress == [250]
+
+    lines = gzip.GzipFile(fileobj=io.BytesIO(out.getvalue())).read().decode("utf-8").splitlines()
+    assert len(lines) == 250
+    assert json.loads(lines[3]) == {"id": 4, "name": "c3", "resource_uri": "/api/v1/category/4/"}
+
+    out = io.StringIO()
+    api.category.objects.filter(name="c7").export(out, fields=["name"])
+    assert out.getvalue() == '{"name":"c7"}\n'
+
+
+def test_export_csv(api):
+    import io
+
+    category = api.backend.add("category", name="c")
+    api.backend.add("book", title='A "book", really', category=category["resource_uri"], tags=[category["resource_uri"]])
+
+    out = io.StringIO()
+    api.book.objects.export(out, format="csv")
+
+    assert out.getvalue().splitlines() == [
+        "resource_uri,title,category,tags",
+        '/api/v1/book/1/,"A ""book"", really",/api/v1/category/1/,"[""/api/v1/category/1/""]"',
+    ]
@@ -0,0 +1,78 @@
+import threading
+
+from crust.ratelimit import TokenBucket, RateLimiter
+
+from conftest import Backend
+
+
+def fake_clock(monkeypatch):
+    now = [1500000000.0]
+    monkeypatch.setattr("crust.ratelimit.time.time", lambda: now[0])
+    return now
+
+
+def test_token_bucket_burst_and_refill(monkeypatch):
+    now = fake_clock(monkeypatch)
+    bucket = TokenBucket(rate=10, capacity=3)
+
+    assert [bucket.reserve() for i in range(3)] == [0, 0, 0]
+    assert bucket.reserve() == 0.1
+    assert bucket.reserve() == 0.2
+
+    now[0] += 1
+    assert bucket.tokens == 3
+
+
+def test_token_bucket_threads():
+    bucket = TokenBucket(rate=1, capacity=50)
+    waits = []
+
+    def worker():
+        for i in range(10):
+            waits.append(bucket.reserve())
+
+    threads = [threading.Thread(target=worker) for i in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Exactly the burst capacity is handed out without waiting.
+    assert len([w for w in waits if w == 0]) == 50
+    assert max(waits) >= 49
+
+
+def test_rate_limiter_adapts(monkeypatch):
+    now = fake_clock(monkeypatch)
+    limiter = RateLimiter(rate=10, capacity=10, per_resource=True)
+    backend = Backend()
+
+    limiter.observe("a", backend.respond(headers={"X-RateLimit-Remaining": "2"}))
+    assert limiter.bucket("a").tokens == 2
+    assert limiter.bucket("b").tokens == 10
+
+    limiter.observe("a", backend.respond(headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(now[0] + 5)}))
+    assert limiter.reserve("a") == 5
+
+    limiter.observe("b", backend.respond(status=429, headers={"Retry-After": "2"}))
+    assert limiter.bucket("b").rate == 5
+    assert limiter.reserve("b") == 2
+
+    for i in range(20):
+        limiter.observe("b", backend.respond())
+    assert limiter.bucket("b").rate == 10
+
+
+def test_api_rate_limited(api, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("crust.api.time.sleep", sleeps.append)
+
+    for i in range(10):
+        api.backend.add("category", name="c%s" % i)
+
+    api.rate_limiter = RateLimiter(rate=1, capacity=2)
+
+    for i in range(4):
+        api.http_resource("GET", "category/%s" % (i + 1))
+
+    assert len(sleeps) == 2
@@ -0,0 +1,153 @@
+import gc
+import pickle
+
+from crust.api import Api
+from crust.fields import Field, DateTimeField, ToOneField
+from crust.resources import LazyResource, Resource
+
+from conftest import BASE_URL, FakeSession
+
+
+class CompactApi(Api):
+    url = BASE_URL
+    resources = {}
+
+
+class Author(Resource):
+    name = Field()
+
+    class Meta:
+        api = CompactApi
+        resource_name = "author"
+        compact = True
+
+
+class Post(Resource):
+    title = Field()
+    created = DateTimeField()
+    author = ToOneField(Author)
+
+    class Meta:
+        api = CompactApi
+        resource_name = "post"
+        compact = True
+        fields = ["body"]
+
+
+def test_compact_resources_use_slots():
+    post = Post(title="a", created="2013-01-02T03:04:05", body="b")
+
+    assert set(Post.__slots__) == set(["resource_uri", "title", "created", "author", "body"])
+    assert post.title == "a"
+    assert post.created.year == 2013
+    assert post.body == "b"
+
+    # The values are held by the slots, and no __dict__ has been created
+    #   (reading post.__dict__ would create an empty one).
+    assert Post.__dict__["title"].__get__(post, Post) == "a"
+    assert not [r for r in gc.get_referents(post) if isinstance(r, dict)]
+
+
+def test_compact_resources_pickle():
+    original = Post(resource_uri="/api/v1/post/1/", title="a", body="b")
+    post = pickle.loads(pickle.dumps(original))
+
+    assert post.resource_uri == "/api/v1/post/1/"
+    assert post.title == "a"
+    assert post.body == "b"
+
+    # Neither instance has been given a __dict__ by pickling.
+    for obj in [original, post]:
+        assert not [r for r in gc.get_referents(obj) if isinstance(r, dict)]
+
+
+def test_compact_resources_save_and_resolve(backend):
+    api = CompactApi(session=FakeSession(backend))
+    author = Author.objects.create(name="x")
+
+    post = Post.objects.create(title="a", author=author.resource_uri)
+    post.title = "b"
+    post.save()
+
+    post = Post.objects.get(title="b")
+
+    assert isinstance(post.author, LazyResource)
+    assert post.author.name == "x"
+    assert backend.data["post"][0]["author"] == author.resource_uri
+    assert api.post is Post
+
+    # Attributes are set on the object the proxy loaded.
+    post.author.name = "y"
+    post.author.save()
+
+    assert post.author.name == "y"
+    assert backend.data["author"][0]["name"] == "y"
+
+
+class LazyApi(Api):
+    url = BASE_URL
+    resources = {}
+
+
+class Venue(Resource):
+    name = Field()
+
+    class Meta:
+        api = LazyApi
+        resource_name = "venue"
+
+
+class Event(Resource):
+    name = Field()
+    start = DateTimeField()
+    end = DateTimeField()
+    venue = ToOneField(Venue)
+
+    class Meta:
+        api = LazyApi
+        resource_name = "event"
+        lazy_hydration = True
+
+
+def test_lazy_hydration_hydrates_on_access(monkeypatch):
+    calls = []
+    hydrate = DateTimeField.hydrate
+    monkeypatch.setattr(DateTimeField, "hydrate", lambda self, value: calls.append(value) or hydrate(self, value))
+
+    event = Event(name="a", start="2013-01-02T03:04:05", end="2013-01-03T03:04:05")
+
+    assert event.name == "a"
+    assert calls == []
+    assert event.start.day == 2
+    assert event.start.day == 2
+    assert calls == ["2013-01-02T03:04:05"]
+
+    # As for a concurrent reader which got to the descriptor first.
+    assert Event.__dict__["start"].__get__(event, Event).day == 2
+
+
+def test_lazy_hydration_saves_raw_values(backend):
+    LazyApi(session=FakeSession(backend))
+    backend.add("event", name="a", start="2013-01-02T03:04:05.000+00:00", end="2013-01-03T03:04:05")
+
+    event = Event.objects.get(name="a")
+    event.end = event.end.replace(day=4)
+    event.save()
+
+    assert backend.data["event"][0]["start"] == "2013-01-02T03:04:05.000+00:00"
+    assert backend.data["event"][0]["end"] == "2013-01-04T03:04:05"
+    assert event.end.day == 4
+
+
+def test_lazy_hydration_saves_prefetched_related(backend):
+    LazyApi(session=FakeSession(backend))
+    venue = backend.add("venue", name="v")
+    backend.add("event", name="a", venue=venue["resource_uri"])
+
+    event = Event.objects.prefetch_related("venue").get(name="a")
+    event.name = "b"
+    event.save()
+
+    assert backend.data["event"][0]["name"] == "b"
+    assert backend.data["event"][0]["venue"] == venue["resource_uri"]
+    assert event.venue.name == "v"
@@ -0,0 +1,102 @@
+import pytest
+
+from crust import requests
+from crust.exceptions import CircuitOpenError
+from crust.retry import RetryPolicy, CircuitBreaker
+
+from conftest import Backend
+
+
+def response(status, headers=None):
+    return Backend().respond(status=status, headers=headers)
+
+
+def test_retry_policy_methods():
+    policy = RetryPolicy(total=2)
+
+    assert policy.should_retry("GET", 0, response=response(502))
+    assert policy.should_retry("GET", 1, exception=requests.ConnectionError())
+    assert not policy.should_retry("GET", 2, response=response(502))
+    assert not policy.should_retry("GET", 0, response=response(500))
+    assert not policy.should_retry("GET", 0, response=response(200))
+
+    # Non idempotent requests are only retried if they weren't processed.
+    assert not policy.should_retry("POST", 0, response=response(502))
+    assert not policy.should_retry("POST", 0, exception=requests.ConnectionError())
+    assert policy.should_retry("POST", 0, response=response(429))
+    assert policy.should_retry("PATCH", 0, exception=requests.ConnectTimeout())
+
+
+def test_retry_policy_backoff():
+    policy = RetryPolicy(backoff_factor=1, max_backoff=10)
+
+    assert 0 <= policy.backoff(2) <= 4
+    assert policy.backoff(10) <= 10
+    assert policy.backoff(0, response(503, {"Retry-After": "3"})) == 3
+    assert policy.backoff(0, response(503, {"Retry-After": "120"})) == 10
+    assert policy.backoff(0, response(503, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0
+
+
+def test_circuit_breaker(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("crust.retry.time.time", lambda: now[0])
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+
+    breaker.failure("example.com")
+    breaker.before("example.com")
+    breaker.failure("example.com")
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before("example.com")
+
+    # Other hosts are unaffected.
+    breaker.before("example.org")
+
+    # A single trial request is allowed after the timeout.
+    now[0] += 10
+    breaker.before("example.com")
+    assert breaker.state("example.com") == CircuitBreaker.HALF_OPEN
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before("example.com")
+
+    breaker.success("example.com")
+    assert breaker.state("example.com") == CircuitBreaker.CLOSED
+
+
+def test_results_retry_failed_page(api, monkeypatch):
+    monkeypatch.setattr("crust.api.time.sleep", lambda seconds: None)
+
+    for i in range(300):
+        api.backend.add("category", name="c%s" % i)
+
+    original = api.backend.handle
+    failures = []
+
+    def handle(method, url, params=None, **kwargs):
+        if (params or {}).get("offset") == 100 and not failures:
+            failures.append(params)
+            return api.backend.respond(status=503)
+        return original(method, url, params=params, **kwargs)
+
+    api.backend.handle = handle
+    api.retry = RetryPolicy()
+
+    names = [c.name for c in api.category.objects.all()]
+
+    assert names == ["c%s" % i for i in range(300)]
+    assert len(failures) == 1
+    assert api.backend.count("GET") == 3
+
+
+def test_circuit_breaker_fails_fast(api):
+    api.backend.handle = lambda *args, **kwargs: api.backend.respond(status=502)
+    api.circuit_breaker = CircuitBreaker(failure_threshold=2)
+
+    for i in range(2):
+        with pytest.raises(requests.HTTPError):
+            api.http_resource("GET", "category")
+
+    with pytest.raises(CircuitOpenError):
+        api.http_resource("GET", "category")
@@ -0,0 +1,101 @@
+import datetime
+import os
+
+import pytest
+
+from crust import requests
+from crust.api import Api
+from crust.fields import DateTimeField, ToOneField, ToManyField
+
+from conftest import BASE_URL, Backend, FakeSession
+
+
+SCHEMAS = {
+    "author": {"fields": {
+        "id": {"type": "integer", "readonly": False},
+        "name": {"type": "string", "readonly": False},
+        "resource_uri": {"type": "string", "readonly": True},
+    }},
+    "blog_post": {"fields": {
+        "id": {"type": "integer", "readonly": False},
+        "published": {"type": "datetime", "readonly": False},
+        "author": {"type": "related", "related_type": "to_one", "related_schema": "/api/v1/author/schema/"},
+        "editors": {"type": "related", "related_type": "to_many", "related_schema": "/api/v1/author/schema/"},
+        "rank": {"type": "integer", "readonly": True},
+    }},
+}
+
+
+@pytest.fixture
+def schema_backend():
+    backend = Backend()
+    backend.schemas = SCHEMAS
+    return backend
+
+
+def test_from_schema(schema_backend):
+    api = Api.from_schema(BASE_URL, session=FakeSession(schema_backend))
+
+    assert sorted(api.resources) == ["author", "blog_post"]
+    assert api.blog_post.__name__ == "BlogPost"
+
+    fields = api.blog_post._meta.fields
+    assert isinstance(fields["published"], DateTimeField)
+    assert isinstance(fields["author"], ToOneField) and fields["author"].resource_class is api.author
+    assert isinstance(fields["editors"], ToManyField)
+    assert not fields["rank"].serialize
+    assert "resource_uri" not in api.author._meta.fields
+
+    author = schema_backend.add("author", name="Ann")
+    schema_backend.add("blog_post", published="2013-01-02T03:04:05", author=author["resource_uri"], editors=[])
+
+    post = api.blog_post.objects.get(id=1)
+    assert post.published == datetime.datetime(2013, 1, 2, 3, 4, 5)
+    assert post.author.name == "Ann"
+
+    # Base Api is left untouched.
+    assert "author" not in Api.resources
+
+
+def test_from_schema_fetches_each_schema(schema_backend):
+    # Older versions of Tastypie ignore fullschema.
+    backend = schema_backend
+    original = backend.handle
+
+    def handle(method, url, params=None, **kwargs):
+        return original(method, url, params=dict((k, v) for k, v in (params or {}).items() if k != "fullschema"), **kwargs)
+
+    backend.handle = handle
+
+    api = Api.from_schema(BASE_URL, session=FakeSession(backend))
+
+    assert isinstance(api.blog_post._meta.fields["author"], ToOneField)
+    assert backend.count("GET") == 3
+
+
+def test_from_schema_cache(schema_backend, tmpdir):
+    cache_dir = str(tmpdir.join("schemas"))
+
+    Api.from_schema(BASE_URL, cache_dir=cache_dir, session=FakeSession(schema_backend))
+    api = Api.from_schema(BASE_URL, cache_dir=cache_dir, session=FakeSession(schema_backend))
+
+    assert sorted(api.resources) == ["author", "blog_post"]
+    assert schema_backend.count("GET") == 1
+
+    # Stale schemas are downloaded again.
+    for name in os.listdir(cache_dir):
+        os.utime(os.path.join(cache_dir, name), (0, 0))
+
+    Api.from_schema(BASE_URL, cache_dir=cache_dir, session=FakeSession(schema_backend))
+    assert schema_backend.count("GET") == 2
+
+    # Unless the API can't be reached.
+    for name in os.listdir(cache_dir):
+        os.utime(os.path.join(cache_dir, name), (0, 0))
+
+    class DownSession(requests.Session):
+        def request(self, *args, **kwargs):
+            raise requests.ConnectionError("down")
+
+    api = Api.from_schema(BASE_URL, cache_dir=cache_dir, session=DownSession())
+    assert sorted(api.resources) == ["author", "blog_post"]
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from crust import requests
+from crust.api import Api
+from crust.exceptions import ResponseError
+from crust.serializers import JSONSerializer, Serializer, SerializerRegistry, json_serializer
+
+
+class ReversedSerializer(Serializer):
+
+    content_type = "application/x-reversed"
+
+    def dumps(self, o):
+        return json.dumps(o)[::-1].encode("utf-8")
+
+    def loads(self, s):
+        return json.loads(s[::-1].decode("utf-8"))
+
+
+def response(body, content_type):
+    r = requests.Response()
+    r.status_code = 200
+    r.headers["Content-Type"] = content_type
+    r._content = body
+    return r
+
+
+def test_negotiates_preferred_format():
+    registry = SerializerRegistry()
+    registry.register(JSONSerializer())
+    registry.register(ReversedSerializer())
+
+    class TestApi(Api):
+        url = "http://example.com/api/v1/"
+        resources = {}
+        formats = ["application/x-msgpack", "application/x-reversed", "application/json"]
+        serializers = registry
+
+    api = TestApi()
+
+    assert api.session.headers["Content-Type"] == "application/x-reversed"
+    assert api.session.headers["Accept"] == "application/x-reversed, application/json;q=0.9"
+    assert api.serialize({"a": 1}) == b'}1 :"a"{'
+
+    # The static JSON methods are still there for existing callers.
+    assert TestApi.resource_serialize({"a": 1}) == '{"a": 1}'
+    assert TestApi.resource_deserialize('{"a": 1}') == {"a": 1}
+
+    assert api.deserialize_response(response(b'{"a": 1}', "application/json; charset=utf-8")) == {"a": 1}
+    assert api.deserialize_response(response(b'}1 :"a"{', "application/x-reversed")) == {"a": 1}
+
+
+def test_json_serializer_decodes_bytes(api):
+    assert json_serializer().loads(b'{"name": "caf\\u00e9"}') == {"name": u"caf\xe9"}
+
+    with pytest.raises(ResponseError):
+        api.deserialize_response(response(b"<html>", "application/json"))
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+
+import pytest
+
+from crust import singleflight
+from crust.singleflight import SingleFlight
+
+
+@pytest.fixture
+def waiters(monkeypatch):
+    """
+    Returns a semaphore released by every caller which waits for a call in
+    flight, so that tests can wait until the followers are committed to it.
+    """
+    semaphore = threading.Semaphore(0)
+    init = singleflight.Call.__init__
+
+    def __init__(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+
+        wait = self.done.wait
+
+        def counted_wait(timeout=None):
+            semaphore.release()
+            return wait(timeout)
+
+        self.done.wait = counted_wait
+
+    monkeypatch.setattr(singleflight.Call, "__init__", __init__)
+
+    return semaphore
+
+
+def test_concurrent_calls_are_coalesced(waiters):
+    group = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return "result"
+
+    def worker():
+        results.append(group.do("key", fn))
+
+    threads = [threading.Thread(target=worker) for i in range(5)]
+    threads[0].start()
+    started.wait()
+    for t in threads[1:]:
+        t.start()
+
+    waiting = [waiters.acquire(timeout=5) for t in threads[1:]]
+
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert all(waiting)
+    assert len(calls) == 1
+    assert results == ["result"] * 5
+
+    # Nothing is kept once the call has finished.
+    assert group.do("key", lambda: "again") == "again"
+
+
+def test_errors_are_shared():
+    group = SingleFlight()
+
+    def fn():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        group.do("key", fn)
+
+    assert group._calls == {}
+
+
+def test_api_shares_concurrent_gets(api, waiters):
+    api.backend.add("category", name="c")
+    api.single_flight = SingleFlight()
+
+    original = api.session.request
+    gate = threading.Event()
+
+    def request(method, url, **kwargs):
+        gate.wait()
+        return original(method, url, **kwargs)
+
+    api.session.request = request
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(api.category.objects.get(id=1))) for i in range(5)]
+    for t in threads:
+        t.start()
+
+    # One of the threads makes the request, the others wait for it.
+    waiting = [waiters.acquire(timeout=5) for t in threads[1:]]
+
+    gate.set()
+    for t in threads:
+        t.join()
+
+    assert all(waiting)
+    assert [c.name for c in results] == ["c"] * 5
+    assert api.backend.count("GET") == 1
+
+
+def test_async_coalesce():
+    from crust.aio import coalesce
+
+    group = SingleFlight()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def main():
+        return await asyncio.gather(*[coalesce(group, "key", fn) for i in range(5)])
+
+    assert asyncio.run(main()) == [1] * 5
+    assert group.futures == {}
+
+
+def test_async_coalesce_survives_cancelled_leader():
+    from crust.aio import coalesce
+
+    group = SingleFlight()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        leader = asyncio.ensure_future(coalesce(group, "key", fn))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(coalesce(group, "key", fn)) for i in range(3)]
+        await asyncio.sleep(0)
+
+        leader.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(main()) == ["result"] * 3
+    assert len(calls) == 1
+    assert group.futures == {}
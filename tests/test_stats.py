@@ -0,0 +1,65 @@
+from crust.stats import Histogram, StatsCollector
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 5):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [(0.1, 2), (1.0, 3), ("+Inf", 4)]
+    assert histogram.sum == 5.65
+
+
+def test_stats_collects_iteration(api):
+    for i in range(250):
+        api.backend.add("category", name="c%s" % i)
+
+    stats = StatsCollector()
+    stats.install(api)
+
+    assert len(list(api.category.objects.all())) == 250
+
+    assert stats.counter("requests_total", resource="category", method="GET", status="200") == 3
+    assert stats.counter("response_bytes_total", resource="category") > 0
+    assert stats.counter("hydrated_objects_total", resource="category") == 250
+    assert stats.counter("results_pages_total", resource="category") == 3
+    assert stats.counter("results_objects_total", resource="category") == 250
+
+    snapshot = stats.snapshot()
+    [(labels, histogram)] = snapshot["histograms"]["request_seconds"]
+    assert labels == {"resource": "category", "method": "GET"}
+    assert histogram["count"] == 3
+
+    text = stats.prometheus()
+    assert '# TYPE crust_requests_total counter' in text
+    assert 'crust_requests_total{method="GET",resource="category",status="200"} 3' in text
+    assert 'crust_request_seconds_bucket{le="+Inf",method="GET",resource="category"} 3' in text
+    assert 'crust_deserialize_seconds_count{content_type="application/json"} 3' in text
+
+    stats.uninstall(api)
+    assert api.hooks == {}
+
+
+def test_stats_collects_prefetch_related(api):
+    category = api.backend.add("category", name="c")
+    for i in range(3):
+        api.backend.add("book", title="b%s" % i, category=category["resource_uri"], tags=[])
+
+    stats = StatsCollector()
+    stats.install(api)
+
+    assert len(list(api.book.objects.prefetch_related("category"))) == 3
+
+    assert stats.counter("hydrated_objects_total", resource="book") == 3
+    assert stats.counter("results_objects_total", resource="book") == 3
+
+
+def test_hooks(api):
+    api.backend.add("category", name="c")
+    events = []
+
+    api.add_hook("request", lambda **info: events.append((info["method"], info["resource"], info["status"])))
+    api.category.objects.get(id=1)
+
+    assert events == [("GET", "category", 200)]
@@ -0,0 +1,128 @@
+import multiprocessing
+
+import pytest
+
+from crust import requests
+from crust.store import PersistentStore
+
+from conftest import Backend
+
+
+def response(content=b"{}", headers=None):
+    r = Backend().respond(headers=dict({"ETag": '"1"'}, **(headers or {})))
+    r._content = content
+    return r
+
+
+@pytest.fixture
+def store(tmpdir):
+    return PersistentStore(str(tmpdir.join("responses.sqlite")))
+
+
+def test_store_round_trip(store):
+    store.set("http://example.com/api/v1/book/", response(b'{"a": 1}', {"Content-Type": "application/json"}))
+
+    entry = store.get("http://example.com/api/v1/book/")
+    assert entry.response.status_code == 200
+    assert entry.response.content == b'{"a": 1}'
+    assert entry.response.headers["Content-Type"] == "application/json"
+    assert entry.conditional_headers() == {"If-None-Match": '"1"'}
+
+    assert store.get("http://example.com/api/v1/other/") is None
+
+
+def test_store_persists(store, tmpdir):
+    store.set("key", response())
+
+    other = PersistentStore(store.path)
+    assert other.get("key") is not None
+    assert len(other) == 1
+
+
+def test_store_ttl(store, monkeypatch):
+    store.ttl = 10
+    store.stale_if_error = False
+    store.set("key", response())
+
+    assert store.get("key") is not None
+
+    now = __import__("time").time() + 20
+    monkeypatch.setattr("crust.store.time.time", lambda: now)
+    assert store.get("key") is None
+    assert len(store) == 0
+
+
+def test_store_evicts_least_recently_used(store):
+    store.max_size = 250
+
+    for key in ("a", "b", "c"):
+        store.set(key, response(b"x" * 100))
+        store.get("a")
+
+    assert store.get("a") is not None
+    assert store.get("b") is None
+    assert store.get("c") is not None
+
+
+def test_store_invalidate(store):
+    store.set("http://example.com/api/v1/book/", response())
+    store.set("http://example.com/api/v1/book/?offset=20", response())
+    store.set("http://example.com/api/v1/author/", response())
+
+    store.invalidate("http://example.com/api/v1/book/")
+
+    assert len(store) == 1
+
+
+def test_store_keeps_total_size(store):
+    def total():
+        return store.connection().execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    store.max_size = 250
+    for key in ("a", "b", "c", "a"):
+        store.set(key, response(b"x" * 100))
+        assert store.size() == total()
+
+    store.set("a", response(b"x" * 10))
+    assert store.size() == total() == 110
+
+    store.invalidate("a")
+    assert store.size() == total() == 100
+
+    store.clear()
+    assert store.size() == 0
+
+    # A store created before the total was kept starts from the sum.
+    store.set("a", response(b"x" * 10))
+    store.connection().execute("DELETE FROM metadata")
+    assert PersistentStore(store.path).size() == 10
+
+
+def test_api_revalidates_and_serves_stale(api, store):
+    api.backend.add("category", name="c")
+    api.cache = store
+
+    assert api.category.objects.get(id=1).name == "c"
+    assert api.category.objects.get(id=1).name == "c"
+    assert api.backend.count("GET") == 2
+    assert len(store) == 1
+
+    def down(*args, **kwargs):
+        raise requests.ConnectionError("down")
+
+    api.session.request = down
+    assert api.category.objects.get(id=1).name == "c"
+
+
+def _write(path, i):
+    PersistentStore(path).set("key-%s" % i, response())
+
+
+def test_store_shared_between_processes(store):
+    processes = [multiprocessing.Process(target=_write, args=(store.path, i)) for i in range(4)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+    assert len(store) == 4
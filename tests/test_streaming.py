@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from crust.exceptions import ResponseError
+from crust.streaming import StreamingPage
+
+
+def chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_streaming_page_decodes_objects_and_meta(size):
+    body = {"objects": [{"id": i, "name": u"caf\xe9 %s" % i, "n": 12345.5} for i in range(5)],
+            "meta": {"total_count": 5, "offset": 0, "limit": 20}}
+    page = StreamingPage(chunks(json.dumps(body).encode("utf-8"), size))
+
+    assert list(page) == body["objects"]
+    assert page.meta == body["meta"]
+
+
+def test_streaming_page_rejects_truncated_responses():
+    page = StreamingPage(chunks(b'{"meta": {}, "objects": [{"id": 1}, {"id"', 4))
+
+    with pytest.raises(ResponseError):
+        list(page)
+
+
+def test_streamed_queryset(api):
+    for i in range(250):
+        api.backend.add("category", name="c%s" % i)
+
+    names = [c.name for c in api.category.objects.stream()[5:]]
+
+    assert names == ["c%s" % i for i in range(5, 250)]